@@ -0,0 +1,126 @@
+# protocols/modbus_simulator.py
+"""
+Datablocks Modbus do simulador.
+
+BlocoComandos separa as escritas vindas dos clientes (que viram comandos)
+das atualizações de status feitas pelo próprio simulador, para que o loop
+não sobrescreva nem reinterprete um comando recém-escrito.
+
+BlocoMedidas responde às leituras direto do barramento de medidas em
+memória compartilhada, quando o servidor roda em outro processo. Cada
+bloco copia um único snapshot por leitura para um vetor pré-alocado.
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Callable, Dict, Optional, Tuple
+
+import numpy as np
+from pymodbus.datastore import ModbusSequentialDataBlock
+
+# Callback chamado a cada coil escrito por um cliente: (endereco, valor)
+CallbackEscrita = Callable[[int, int], None]
+# Status externo de um coil: (endereco, snapshot das medidas ou None) -> valor
+# (None = usar o valor armazenado)
+LeituraStatus = Callable[[int, Optional[np.ndarray]], Optional[int]]
+
+
+class _LeitorBarramento:
+    """Snapshot do barramento em um vetor pré-alocado, protegido por lock."""
+
+    def __init__(self, barramento) -> None:
+        self.barramento = barramento
+        self.medidas = np.empty(barramento.n_medidas)
+        # o servidor atende cada conexão numa thread: o vetor não pode ser compartilhado
+        self.lock = threading.Lock()
+
+    def ler(self) -> np.ndarray:
+        """Atualiza self.medidas; chamar com self.lock adquirido."""
+        self.barramento.ler(self.medidas)
+        return self.medidas
+
+
+class BlocoComandos(ModbusSequentialDataBlock):
+    """Bloco sequencial que notifica cada escrita de cliente via callback."""
+
+    def __init__(
+        self,
+        address: int,
+        values: list,
+        ao_escrever: CallbackEscrita,
+        ler_status: Optional[LeituraStatus] = None,
+        barramento=None,
+    ) -> None:
+        """
+        address: endereço inicial do bloco.
+        values: valores iniciais.
+        ao_escrever: chamado na thread do servidor para cada endereço escrito.
+        ler_status: se informado, fornece o status dos coils na leitura.
+        barramento: BarramentoMedidas opcional; um snapshot por leitura é
+                    repassado a ler_status (None se não houver barramento).
+        """
+        super().__init__(address, values)
+        self.ao_escrever = ao_escrever
+        self.ler_status = ler_status
+        self._leitor = _LeitorBarramento(barramento) if barramento is not None else None
+
+    def getValues(self, address, count=1):
+        valores = super().getValues(address, count)
+        if self.ler_status is None:
+            return valores
+        if self._leitor is None:
+            self._aplicar_status(valores, address, None)
+            return valores
+        with self._leitor.lock:
+            self._aplicar_status(valores, address, self._leitor.ler())
+        return valores
+
+    def _aplicar_status(self, valores: list, address: int, medidas) -> None:
+        for offset in range(len(valores)):
+            status = self.ler_status(address + offset, medidas)
+            if status is not None:
+                valores[offset] = status
+
+    def setValues(self, address, values):
+        """Escrita feita pelo servidor em nome de um cliente Modbus."""
+        super().setValues(address, values)
+        if not isinstance(values, list):
+            values = [values]
+        for offset, valor in enumerate(values):
+            self.ao_escrever(address + offset, int(valor))
+
+    def atualizar_status(self, address: int, values: list) -> None:
+        """Escrita local do simulador (status), sem disparar o callback."""
+        super().setValues(address, values)
+
+
+class BlocoMedidas(ModbusSequentialDataBlock):
+    """Registradores mapeados para o vetor de um BarramentoMedidas."""
+
+    def __init__(
+        self, address: int, count: int, barramento, mapa: Dict[int, Tuple[int, float]]
+    ):
+        """
+        address/count: faixa de registradores do bloco.
+        barramento: BarramentoMedidas (ou objeto com ler() e n_medidas).
+        mapa: registrador -> (índice no vetor de medidas, escala).
+        """
+        super().__init__(address, [0] * count)
+        self.barramento = barramento
+        self.mapa = mapa
+        self._leitor = _LeitorBarramento(barramento)
+
+    def getValues(self, address, count=1):
+        valores = super().getValues(address, count)
+        with self._leitor.lock:
+            medidas = self._leitor.ler()
+            for offset in range(len(valores)):
+                destino = self.mapa.get(address + offset)
+                if destino is None:
+                    continue
+                indice, escala = destino
+                # NaN = nada publicado ainda: mantém o valor armazenado
+                if np.isfinite(medidas[indice]):
+                    valores[offset] = int(medidas[indice] * escala)
+        return valores
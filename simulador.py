@@ -1,8 +1,10 @@
-import time
+import argparse
+import multiprocessing
 import threading
 from collections import deque
 
 import matplotlib.pyplot as plt
+import numpy as np
 import pandas as pd
 import pandapower as pp
 from pynput import keyboard
@@ -10,11 +12,48 @@ from pymodbus.datastore import ModbusSequentialDataBlock, ModbusSlaveContext, Mo
 from pymodbus.device import ModbusDeviceIdentification
 from pymodbus.server.sync import StartTcpServer
 
+from protocols.modbus_simulator import BlocoComandos, BlocoMedidas
+from src.agendador import POLITICAS, AgendadorCiclos
+from src.barramento import AnelComandos, BarramentoMedidas
+from src.comandos import PONTOS_JSON, Comando, FilaComandos, carregar_comandos
+from src.topologia import ProcessadorTopologia, executar_fluxo
+
 # =====================================
 # Variável global para controlar o disjuntor
 # =====================================
 dj_status = True  # True = fechado, False = aberto
 
+# Taxa padrão do loop de simulação (5 Hz -> período de 0,2 s)
+TAXA_CICLO_HZ = 5.0
+
+# =====================================
+# Comandos recebidos (Modbus e teclado)
+# =====================================
+fila_comandos = FilaComandos()
+
+# Coil 1 = posição/comando direto do DJ1 (compatível com scripts/ver_modbus.py)
+COIL_DJ1 = 1
+# Demais coils: pontos de 'Comandos' do pontos.json, a partir do endereço 2
+MAPA_COMANDOS = carregar_comandos(PONTOS_JSON, endereco_inicial=COIL_DJ1 + 1)
+
+# Comandos que manobram o DJ1: (equipamento, tag) -> estado desejado
+MANOBRAS_DJ1 = {
+    ("Disjuntor", "DJ1"): None,  # valor do coil define o estado
+    ("Barra", "CO_CLOSE_BUS_TIE"): True,
+    ("Barra", "CO_OPEN_BUS_TIE"): False,
+    ("Disjuntor", "CMD_Fechar"): True,
+    ("Disjuntor", "CMD_Abrir"): False,
+}
+
+# =====================================
+# Vetor de medidas (barramento em memória compartilhada)
+# =====================================
+MEDIDAS = ("V_pu", "P_kw", "Q_kvar", "DJ1", "DI_BARRA_ENERGIZADA")
+# Registrador holding -> (índice em MEDIDAS, escala)
+REGISTRADORES_MEDIDAS = {1: (0, 1000.0), 2: (1, 1.0), 3: (2, 1.0)}
+# Entrada discreta 1 = DI_BARRA_ENERGIZADA da BARRA2
+DISCRETOS_MEDIDAS = {1: (4, 1.0)}
+
 
 # =====================================
 # Criação da rede N1
@@ -76,14 +115,44 @@ def create_network():
 # =====================================
 # Setup do servidor Modbus
 # =====================================
-def setup_modbus():
+def command_from_coil(endereco, valor):
     """
-    Configura o servidor Modbus TCP.
+    Converte a escrita de um coil em Comando.
+    Retorna None se o endereço não for de comando (ou pulso em 0).
+    """
+    if endereco == COIL_DJ1:
+        return Comando("Disjuntor", "DJ1", valor, origem="modbus")
+    if endereco in MAPA_COMANDOS and valor:
+        equipamento, tag = MAPA_COMANDOS[endereco]
+        return Comando(equipamento, tag, valor, origem="modbus")
+    return None
+
+
+def on_coil_write(endereco, valor):
+    """
+    Callback do BlocoComandos (thread do servidor Modbus).
+    Converte a escrita em Comando e enfileira para a simulação.
     """
-    holding = ModbusSequentialDataBlock(1, [0] * 100)
-    coils = ModbusSequentialDataBlock(1, [1] * 100)
+    cmd = command_from_coil(endereco, valor)
+    if cmd is not None:
+        fila_comandos.enfileirar(cmd)
 
-    slave_ctx = ModbusSlaveContext(di=None, co=coils, hr=holding, ir=None, zero_mode=True)
+
+def setup_modbus(holding=None, coils=None, discretos=None):
+    """
+    Configura o servidor Modbus TCP.
+    Retorna o contexto, a identificação e o bloco de coils de comando.
+    Os blocos podem ser substituídos (ex: no processo do servidor).
+    """
+    if holding is None:
+        holding = ModbusSequentialDataBlock(1, [0] * 100)
+    if discretos is None:
+        discretos = ModbusSequentialDataBlock(1, [0] * 100)
+    if coils is None:
+        coils = BlocoComandos(1, [0] * 100, ao_escrever=on_coil_write)
+        coils.atualizar_status(COIL_DJ1, [int(dj_status)])
+
+    slave_ctx = ModbusSlaveContext(di=discretos, co=coils, hr=holding, ir=None, zero_mode=True)
     context = ModbusServerContext(slaves={0x01: slave_ctx}, single=False)
 
     identity = ModbusDeviceIdentification()
@@ -91,7 +160,7 @@ def setup_modbus():
     identity.ProductName = "PowerSim-Modbus"
     identity.MajorMinorRevision = "0.3"
 
-    return context, identity
+    return context, identity, coils
 
 
 # =====================================
@@ -102,127 +171,309 @@ def modbus_server_thread(context, identity):
     StartTcpServer(context, identity=identity, address=("0.0.0.0", 5020))
 
 
+# =====================================
+# Processo do servidor Modbus (modo multiprocesso)
+# =====================================
+def modbus_server_process(nome_barramento, nome_anel, campainha):
+    """
+    Servidor Modbus em processo próprio.
+    Lê as medidas direto do BarramentoMedidas e devolve os comandos pelo
+    AnelComandos; não disputa o GIL com o solver.
+    """
+    barramento = BarramentoMedidas.anexar(nome_barramento)
+    anel = AnelComandos.anexar(nome_anel, campainha=campainha)
+    # o anel é SPSC: serializa as threads de conexão deste processo
+    lock_anel = threading.Lock()
+    i_dj1 = MEDIDAS.index("DJ1")
+
+    def enviar_comando(endereco, valor):
+        with lock_anel:
+            if not anel.enviar(endereco, valor):
+                print(f"Anel de comandos cheio, comando descartado: {endereco}={valor}")
+
+    def ler_status(endereco, medidas):
+        # medidas: snapshot único da leitura, copiado pelo BlocoComandos
+        if endereco == COIL_DJ1:
+            # NaN: nada publicado ainda
+            return int(medidas[i_dj1]) if np.isfinite(medidas[i_dj1]) else None
+        if endereco in MAPA_COMANDOS:
+            return 0  # coils de comando são pulsos
+        return None
+
+    holding = BlocoMedidas(1, 100, barramento, REGISTRADORES_MEDIDAS)
+    discretos = BlocoMedidas(1, 100, barramento, DISCRETOS_MEDIDAS)
+    coils = BlocoComandos(
+        1, [0] * 100, ao_escrever=enviar_comando, ler_status=ler_status, barramento=barramento
+    )
+    context, identity, _ = setup_modbus(holding, coils, discretos)
+    modbus_server_thread(context, identity)
+
+
+def command_bridge_thread(anel, campainha):
+    """Repassa os comandos do anel compartilhado para a fila da simulação."""
+    while True:
+        campainha.wait()
+        campainha.clear()
+        for endereco, valor, t_escrita in anel.retirar_todos():
+            cmd = command_from_coil(endereco, valor)
+            if cmd is not None:
+                cmd.t_escrita = t_escrita
+                fila_comandos.enfileirar(cmd)
+
+
 # =====================================
 # Função para teclado
 # =====================================
 def on_press(key):
     """
-    Atualiza o estado do disjuntor com o teclado.
+    Comanda o disjuntor com o teclado.
     'f' = fechar, 'o' = abrir.
     """
-    global dj_status
     try:
         if key.char == "f":
-            dj_status = True
-            print("Disjuntor FECHADO")
+            fila_comandos.enfileirar(Comando("Disjuntor", "DJ1", 1, origem="teclado"))
         elif key.char == "o":
-            dj_status = False
-            print("Disjuntor ABERTO")
+            fila_comandos.enfileirar(Comando("Disjuntor", "DJ1", 0, origem="teclado"))
     except AttributeError:
         pass
 
 
+# =====================================
+# Aplicação dos comandos
+# =====================================
+def apply_commands(comandos, coils):
+    """
+    Aplica os comandos pendentes ao estado da simulação.
+    Os coils de comando são pulsos: voltam a 0 depois de tratados.
+    """
+    global dj_status
+
+    for cmd in comandos:
+        chave = (cmd.equipamento, cmd.tag)
+        if chave in MANOBRAS_DJ1:
+            estado = MANOBRAS_DJ1[chave]
+            dj_status = bool(cmd.valor) if estado is None else estado
+            print(f"Disjuntor {'FECHADO' if dj_status else 'ABERTO'} ({cmd})")
+        else:
+            print(f"Comando sem manobra associada: {cmd}")
+
+    if coils is None:
+        return
+    for endereco in MAPA_COMANDOS:
+        coils.atualizar_status(endereco, [0])
+
+
 # =====================================
 # Loop de simulação interativo
 # =====================================
-def simulation_loop(net, b2, sw, load, context):
+def solve_and_publish(net, b2, sw, load, context, coils, topologia, barramento=None):
+    """
+    Aplica o estado do disjuntor, roda o load flow e publica no Modbus
+    (ou no barramento compartilhado, no modo multiprocesso).
+    Retorna V (pu), P (kW) e Q (kVar) da barra LV.
+    """
+    # Atualiza o disjuntor
+    net.switch.at[sw, "closed"] = dj_status
+
+    # Roda load flow só nas ilhas energizadas (barras mortas zeradas)
+    energizadas = executar_fluxo(net, topologia)
+
+    # Resultados
+    v_pu = net.res_bus.vm_pu.at[b2]
+    p_kw = net.res_load.p_mw.at[load] * 1000.0
+    q_kvar = net.res_load.q_mvar.at[load] * 1000.0
+
+    if barramento is not None:
+        barramento.publicar([v_pu, p_kw, q_kvar, float(dj_status), float(energizadas[b2])])
+        return v_pu, p_kw, q_kvar
+
+    # Atualiza registradores Modbus
+    context[0x01].setValues(3, 1, [int(v_pu * 1000)])
+    context[0x01].setValues(3, 2, [int(p_kw)])
+    context[0x01].setValues(3, 3, [int(q_kvar)])
+    context[0x01].setValues(2, 1, [int(energizadas[b2])])
+    coils.atualizar_status(COIL_DJ1, [int(dj_status)])
+
+    return v_pu, p_kw, q_kvar
+
+
+def simulation_loop(
+    net,
+    b2,
+    sw,
+    load,
+    context,
+    coils,
+    topologia,
+    taxa_hz=TAXA_CICLO_HZ,
+    politica="pular",
+    headless=False,
+    barramento=None,
+):
     """
     Loop de simulação com gráficos interativos e histórico.
+
+    O período é mantido pelo AgendadorCiclos (deadline fixo no relógio
+    monotônico), então o tempo de load flow e de plotagem não gera deriva.
+    Em modo headless os gráficos são desativados, permitindo taxas altas.
+    Comandos recebidos entre dois ciclos são aplicados na hora, com um
+    load flow imediato, sem esperar o próximo deadline.
+    Com barramento, as medidas vão para a memória compartilhada e
+    context/coils podem ser None.
     """
-    global dj_status
 
     max_len = 50
     hist_time = deque(maxlen=max_len)
+    hist_ts = deque(maxlen=max_len)
     hist_v = deque(maxlen=max_len)
     hist_p = deque(maxlen=max_len)
     hist_q = deque(maxlen=max_len)
     hist_dj = deque(maxlen=max_len)
 
-    plt.ion()
-    fig, ax = plt.subplots(4, 1, figsize=(8, 8))
+    if not headless:
+        plt.ion()
+        fig, ax = plt.subplots(4, 1, figsize=(8, 8))
 
-    t_counter = 0
+    agendador = AgendadorCiclos(frequencia_hz=taxa_hz, politica=politica)
+    agendador.iniciar()
     while True:
-        t_counter += 1
-
-        # Atualiza o disjuntor
-        net.switch.at[sw, "closed"] = dj_status
-
-        # Roda load flow
-        pp.runpp(net)
-
-        # Resultados
-        v_pu = net.res_bus.vm_pu.at[b2]
-        p_kw = net.res_load.p_mw.at[load] * 1000.0
-        q_kvar = net.res_load.q_mvar.at[load] * 1000.0
-
-        # Atualiza registradores Modbus
-        context[0x01].setValues(3, 1, [int(v_pu * 1000)])
-        context[0x01].setValues(3, 2, [int(p_kw)])
-        context[0x01].setValues(3, 3, [int(q_kvar)])
-        context[0x01].setValues(1, 1, [int(dj_status)])
+        # o próprio agendador espera pelo comando, então o atraso é medido só por ele
+        tick = agendador.esperar(acordar=fila_comandos.evento)
+        if tick is None:
+            # Comando chegou antes do deadline: re-solve imediato
+            comandos = fila_comandos.retirar_todos()
+            if comandos:
+                apply_commands(comandos, coils)
+                solve_and_publish(net, b2, sw, load, context, coils, topologia, barramento)
+                for cmd in comandos:
+                    latencia = fila_comandos.confirmar(cmd)
+                    print(f"[comando] {cmd} -> status em {latencia * 1000:.1f} ms")
+            continue
+
+        t_counter = tick.indice
+
+        v_pu, p_kw, q_kvar = solve_and_publish(
+            net, b2, sw, load, context, coils, topologia, barramento
+        )
 
         # Logging
         print(
             f"[{t_counter}] Disjuntor: {'FECHADO' if dj_status else 'ABERTO'} | "
-            f"V: {v_pu:.3f} pu | P: {p_kw:.1f} kW | Q: {q_kvar:.1f} kVar"
+            f"V: {v_pu:.3f} pu | P: {p_kw:.1f} kW | Q: {q_kvar:.1f} kVar | "
+            f"atraso: {tick.atraso_s * 1000:.1f} ms"
         )
 
         # Atualiza histórico
         hist_time.append(t_counter)
+        hist_ts.append(pd.Timestamp(tick.timestamp, unit="s"))
         hist_v.append(v_pu)
         hist_p.append(p_kw)
         hist_q.append(q_kvar)
         hist_dj.append(1 if dj_status else 0)
 
-        # Atualiza gráficos
-        ax[0].cla()
-        ax[0].plot(hist_time, hist_v, "-o", color="blue")
-        ax[0].set_ylabel("V (pu)")
+        if not headless:
+            # Atualiza gráficos
+            ax[0].cla()
+            ax[0].plot(hist_time, hist_v, "-o", color="blue")
+            ax[0].set_ylabel("V (pu)")
 
-        ax[1].cla()
-        ax[1].plot(hist_time, hist_p, "-o", color="green")
-        ax[1].set_ylabel("P (kW)")
+            ax[1].cla()
+            ax[1].plot(hist_time, hist_p, "-o", color="green")
+            ax[1].set_ylabel("P (kW)")
 
-        ax[2].cla()
-        ax[2].plot(hist_time, hist_q, "-o", color="red")
-        ax[2].set_ylabel("Q (kVar)")
+            ax[2].cla()
+            ax[2].plot(hist_time, hist_q, "-o", color="red")
+            ax[2].set_ylabel("Q (kVar)")
 
-        ax[3].cla()
-        ax[3].plot(hist_time, hist_dj, "-o", color="black")
-        ax[3].set_ylabel("Disjuntor")
-        ax[3].set_xlabel("Ciclos")
+            ax[3].cla()
+            ax[3].plot(hist_time, hist_dj, "-o", color="black")
+            ax[3].set_ylabel("Disjuntor")
+            ax[3].set_xlabel("Ciclos")
 
-        plt.pause(0.01)
+            plt.pause(0.01)
 
         # Salva histórico
         df = pd.DataFrame(
-            {"Ciclo": hist_time, "V_pu": hist_v, "P_kw": hist_p, "Q_kvar": hist_q, "Disjuntor": hist_dj}
+            {
+                "Ciclo": hist_time,
+                "Timestamp": hist_ts,
+                "V_pu": hist_v,
+                "P_kw": hist_p,
+                "Q_kvar": hist_q,
+                "Disjuntor": hist_dj,
+            }
         )
         df.to_csv("historico_n1_interativo.csv", index=False)
 
-        time.sleep(0.2)
+        if agendador.estatisticas.ciclos % max_len == 0:
+            print(f"[agendador] {agendador.estatisticas}")
+            print(f"[comandos] {fila_comandos.latencia}")
 
 
 # =====================================
 # Main
 # =====================================
 def main():
-    global dj_status
+    parser = argparse.ArgumentParser(description="Simulador N1")
+    parser.add_argument("--taxa", type=float, default=TAXA_CICLO_HZ, help="Ciclos por segundo")
+    parser.add_argument(
+        "--politica", choices=POLITICAS, default="pular", help="Tratamento de atraso do ciclo"
+    )
+    parser.add_argument("--headless", action="store_true", help="Desativa os gráficos")
+    parser.add_argument(
+        "--multiprocesso",
+        action="store_true",
+        help="Servidor Modbus em outro processo, via memória compartilhada",
+    )
+    args = parser.parse_args()
 
-    # Cria rede e Modbus
+    # Cria rede e processador de topologia (ilhas energizadas)
     net, b2, sw, load = create_network()
-    context, identity = setup_modbus()
-
-    # Inicia servidor Modbus
-    threading.Thread(target=modbus_server_thread, args=(context, identity), daemon=True).start()
+    topologia = ProcessadorTopologia.de_pandapower(net)
+
+    barramento = anel = None
+    if args.multiprocesso:
+        # Solver publica medidas; servidor Modbus roda em processo próprio
+        campainha = multiprocessing.Event()
+        barramento = BarramentoMedidas.criar(len(MEDIDAS))
+        anel = AnelComandos.criar(campainha=campainha)
+        multiprocessing.Process(
+            target=modbus_server_process,
+            args=(barramento.nome, anel.nome, campainha),
+            daemon=True,
+        ).start()
+        threading.Thread(target=command_bridge_thread, args=(anel, campainha), daemon=True).start()
+        context = coils = None
+    else:
+        # Inicia servidor Modbus em thread do mesmo processo
+        context, identity, coils = setup_modbus()
+        threading.Thread(
+            target=modbus_server_thread, args=(context, identity), daemon=True
+        ).start()
 
     # Inicia listener do teclado
     listener = keyboard.Listener(on_press=on_press)
     listener.start()
 
     # Inicia simulação
-    simulation_loop(net, b2, sw, load, context)
+    try:
+        simulation_loop(
+            net,
+            b2,
+            sw,
+            load,
+            context,
+            coils,
+            topologia,
+            taxa_hz=args.taxa,
+            politica=args.politica,
+            headless=args.headless,
+            barramento=barramento,
+        )
+    finally:
+        if barramento is not None:
+            barramento.fechar()
+            anel.fechar()
 
 
 if __name__ == "__main__":
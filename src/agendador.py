@@ -0,0 +1,260 @@
+# src/agendador.py
+"""
+Agendador de ciclos de passo fixo para o loop de simulação.
+
+Funcionalidade:
+- Dormir até o próximo deadline (relógio monotônico), sem acumular deriva.
+- Tratar atrasos (overrun) conforme a política configurada:
+    * "pular": descarta os ciclos perdidos e realinha no próximo deadline.
+    * "recuperar": executa os ciclos perdidos em sequência, sem dormir, até
+      um limite; o excedente é descartado como em "pular".
+    * "degradar": reduz a taxa (dobra o período) enquanto houver atraso e
+      volta gradualmente para a taxa nominal após alguns ciclos seguidos
+      dentro do período (histerese).
+- Contabilizar jitter, atrasos e ciclos pulados.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Callable, Optional
+
+POLITICA_PULAR = "pular"
+POLITICA_RECUPERAR = "recuperar"
+POLITICA_DEGRADAR = "degradar"
+POLITICAS = (POLITICA_PULAR, POLITICA_RECUPERAR, POLITICA_DEGRADAR)
+
+
+class Tick:
+    """Informações de um ciclo liberado pelo agendador."""
+
+    def __init__(
+        self, indice: int, deadline: float, timestamp: float, atraso_s: float
+    ) -> None:
+        """
+        indice: número do ciclo (a partir de 1, conta ciclos pulados).
+        deadline: instante programado no relógio monotônico.
+        timestamp: instante programado em tempo de parede (epoch), alinhado ao período.
+        atraso_s: diferença entre o despertar real e o deadline.
+        """
+        self.indice = int(indice)
+        self.deadline = float(deadline)
+        self.timestamp = float(timestamp)
+        self.atraso_s = float(atraso_s)
+
+    def __repr__(self) -> str:
+        return f"Tick(#{self.indice}, ts={self.timestamp:.3f}, atraso={self.atraso_s * 1e3:.2f} ms)"
+
+
+class EstatisticasCiclo:
+    """Acumula jitter e contagem de atrasos do agendador."""
+
+    def __init__(self) -> None:
+        self.ciclos = 0
+        self.atrasos = 0
+        self.ciclos_pulados = 0
+        self.jitter_max_s = 0.0
+        self._jitter_soma_s = 0.0
+
+    @property
+    def jitter_medio_s(self) -> float:
+        return self._jitter_soma_s / self.ciclos if self.ciclos else 0.0
+
+    def registrar(self, jitter_s: float) -> None:
+        self.ciclos += 1
+        self._jitter_soma_s += jitter_s
+        if jitter_s > self.jitter_max_s:
+            self.jitter_max_s = jitter_s
+
+    def como_dict(self) -> dict:
+        return {
+            "ciclos": self.ciclos,
+            "atrasos": self.atrasos,
+            "ciclos_pulados": self.ciclos_pulados,
+            "jitter_medio_ms": self.jitter_medio_s * 1e3,
+            "jitter_max_ms": self.jitter_max_s * 1e3,
+        }
+
+    def __repr__(self) -> str:
+        return (
+            f"EstatisticasCiclo(ciclos={self.ciclos}, atrasos={self.atrasos}, "
+            f"pulados={self.ciclos_pulados}, jitter_medio={self.jitter_medio_s * 1e3:.2f} ms, "
+            f"jitter_max={self.jitter_max_s * 1e3:.2f} ms)"
+        )
+
+
+class AgendadorCiclos:
+    """Agendador de passo fixo baseado em deadlines (compensa a deriva)."""
+
+    def __init__(
+        self,
+        frequencia_hz: float = 5.0,
+        politica: str = POLITICA_PULAR,
+        frequencia_min_hz: Optional[float] = None,
+        max_recuperacao: int = 5,
+        ciclos_para_acelerar: int = 5,
+        relogio: Callable[[], float] = time.monotonic,
+        dormir: Callable[[float], None] = time.sleep,
+    ) -> None:
+        """
+        frequencia_hz: taxa nominal dos ciclos (ex: 5 Hz -> período de 0,2 s).
+        politica: tratamento de atrasos ("pular", "recuperar" ou "degradar").
+        frequencia_min_hz: limite inferior da taxa na política "degradar"
+                           (padrão: 1/8 da taxa nominal).
+        max_recuperacao: máximo de ciclos perdidos executados em sequência na
+                         política "recuperar"; os demais são pulados.
+        ciclos_para_acelerar: ciclos seguidos dentro do período exigidos na
+                              política "degradar" antes de dobrar a taxa.
+        relogio/dormir: funções de tempo, substituíveis em testes.
+        """
+        if frequencia_hz <= 0:
+            raise ValueError("frequencia_hz deve ser positiva")
+        if politica not in POLITICAS:
+            raise ValueError(f"Política de atraso desconhecida: {politica}")
+        if max_recuperacao < 0 or ciclos_para_acelerar < 1:
+            raise ValueError(
+                "max_recuperacao deve ser >= 0 e ciclos_para_acelerar >= 1"
+            )
+
+        self.periodo_nominal_s = 1.0 / float(frequencia_hz)
+        self.periodo_s = self.periodo_nominal_s
+        self.periodo_max_s = 1.0 / float(frequencia_min_hz or frequencia_hz / 8.0)
+        self.politica = politica
+        self.max_recuperacao = int(max_recuperacao)
+        self.ciclos_para_acelerar = int(ciclos_para_acelerar)
+        self.estatisticas = EstatisticasCiclo()
+
+        self._relogio = relogio
+        self._dormir = dormir
+        self._inicio: Optional[float] = None
+        self._inicio_epoch = 0.0
+        self._deadline = 0.0
+        self._indice = 0
+        self._pontuais = 0
+        # deadlines até este instante já eram devidos quando o atraso foi tratado
+        self._devido_ate = float("-inf")
+
+    @property
+    def frequencia_hz(self) -> float:
+        """Taxa efetiva no momento (difere da nominal na política "degradar")."""
+        return 1.0 / self.periodo_s
+
+    def iniciar(self) -> None:
+        """Fixa a referência de tempo; o primeiro ciclo é liberado imediatamente."""
+        self._inicio = self._relogio()
+        self._inicio_epoch = time.time()
+        self._deadline = self._inicio
+        self._indice = 0
+        self._pontuais = 0
+        self._devido_ate = float("-inf")
+        self.periodo_s = self.periodo_nominal_s
+
+    def tempo_restante(self) -> float:
+        """Segundos até o próximo deadline (0 se já passou ou não iniciado)."""
+        if self._inicio is None:
+            return 0.0
+        return max(0.0, self._deadline - self._relogio())
+
+    def esperar(
+        self,
+        parar: Optional[threading.Event] = None,
+        acordar: Optional[threading.Event] = None,
+    ) -> Optional[Tick]:
+        """
+        Bloqueia até o deadline do próximo ciclo e o devolve.
+
+        parar: se informado, a espera é interrompível (Event.wait no lugar de sleep).
+        acordar: se sinalizado antes do deadline (ex: comando recebido), devolve
+                 None sem consumir o ciclo; o atraso continua sendo medido aqui.
+        """
+        if self._inicio is None:
+            self.iniciar()
+
+        agora = self._relogio()
+        atrasado = self._indice > 0 and agora > self._deadline
+        # na política "recuperar", os ciclos devidos do mesmo atraso não contam de novo
+        if atrasado and self._deadline > self._devido_ate:
+            self._tratar_atraso(agora)
+
+        espera = self._deadline - agora
+        if espera > 0:
+            if acordar is not None:
+                if acordar.wait(espera):
+                    return None
+            elif parar is not None:
+                parar.wait(espera)
+            else:
+                self._dormir(espera)
+            agora = self._relogio()
+
+        atraso = max(0.0, agora - self._deadline)
+        self._indice += 1
+        tick = Tick(
+            self._indice,
+            self._deadline,
+            self._inicio_epoch + (self._deadline - self._inicio),
+            atraso,
+        )
+        self.estatisticas.registrar(atraso)
+
+        if self.politica == POLITICA_DEGRADAR and not atrasado:
+            self._pontuais += 1
+            if (
+                self.periodo_s > self.periodo_nominal_s
+                and self._pontuais >= self.ciclos_para_acelerar
+            ):
+                # ciclos seguidos couberam no período: volta um passo à taxa nominal
+                self.periodo_s = max(self.periodo_nominal_s, self.periodo_s / 2.0)
+                self._pontuais = 0
+        self._deadline += self.periodo_s
+        return tick
+
+    def _tratar_atraso(self, agora: float) -> None:
+        """O trabalho do ciclo anterior passou do deadline: aplica a política."""
+        self.estatisticas.atrasos += 1
+        self._pontuais = 0
+        if self.politica == POLITICA_RECUPERAR:
+            # mantém a grade original; até max_recuperacao ciclos perdidos
+            # saem em sequência, o excedente é pulado
+            excedente = (
+                int((agora - self._deadline) // self.periodo_s) - self.max_recuperacao
+            )
+            self._pular(excedente)
+            self._devido_ate = agora
+            return
+
+        if self.politica == POLITICA_DEGRADAR:
+            anterior = self._deadline - self.periodo_s
+            self.periodo_s = min(self.periodo_max_s, self.periodo_s * 2.0)
+            self._deadline = anterior + self.periodo_s
+            if agora <= self._deadline:
+                return
+
+        self._pular(int((agora - self._deadline) // self.periodo_s))
+
+    def _pular(self, perdidos: int) -> None:
+        """Avança o deadline descartando ciclos perdidos."""
+        if perdidos > 0:
+            self._deadline += perdidos * self.periodo_s
+            self._indice += perdidos
+            self.estatisticas.ciclos_pulados += perdidos
+
+    def executar(
+        self,
+        funcao: Callable[[Tick], None],
+        parar: Optional[threading.Event] = None,
+        max_ciclos: Optional[int] = None,
+    ) -> EstatisticasCiclo:
+        """Chama funcao(tick) a cada ciclo até parar ser sinalizado ou max_ciclos."""
+        self.iniciar()
+        executados = 0
+        while not (parar is not None and parar.is_set()):
+            if max_ciclos is not None and executados >= max_ciclos:
+                break
+            tick = self.esperar(parar)
+            if parar is not None and parar.is_set():
+                break
+            funcao(tick)
+            executados += 1
+        return self.estatisticas
@@ -0,0 +1,206 @@
+# src/barramento.py
+"""
+Barramento de medidas e anel de comandos em memória compartilhada.
+
+Funcionalidade:
+- BarramentoMedidas: o processo do solver publica o vetor de medidas de cada
+  ciclo em um segmento multiprocessing.shared_memory com dois slots
+  (double buffer) protegidos por seqlock. Os servidores de protocolo, em
+  outros processos, leem sem lock e sem serialização.
+- AnelComandos: fila circular SPSC (um produtor, um consumidor) sem lock,
+  por onde os comandos voltam dos servidores para o solver. Use um anel por
+  processo produtor.
+
+Os contadores são escritos por um único processo cada e lidos pelos demais;
+a consistência do seqlock assume a ordem de escrita do CPython/x86-64.
+"""
+
+from __future__ import annotations
+
+import time
+from multiprocessing import shared_memory
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+_CABECALHO = 4  # int64: [slot_atual, n_medidas, publicacoes, reservado]
+_CABECALHO_SLOT = 2  # int64 por slot: [seq, publicacao]
+
+
+class BarramentoMedidas:
+    """Vetor de medidas compartilhado entre processos (seqlock + double buffer)."""
+
+    def __init__(self, shm: shared_memory.SharedMemory, criador: bool) -> None:
+        self._shm = shm
+        self._criador = criador
+        self._cabecalho = np.ndarray((_CABECALHO,), dtype=np.int64, buffer=shm.buf)
+        n = int(self._cabecalho[1])
+        deslocamento = _CABECALHO * 8
+        # por slot: seq[0] = contador do seqlock, seq[1] = publicação gravada nele
+        self._seq = []
+        self._dados = []
+        for _ in range(2):
+            self._seq.append(
+                np.ndarray(
+                    (_CABECALHO_SLOT,),
+                    dtype=np.int64,
+                    buffer=shm.buf,
+                    offset=deslocamento,
+                )
+            )
+            deslocamento += 8 * _CABECALHO_SLOT
+            self._dados.append(
+                np.ndarray((n,), dtype=np.float64, buffer=shm.buf, offset=deslocamento)
+            )
+            deslocamento += 8 * n
+
+    @classmethod
+    def criar(cls, n_medidas: int, nome: Optional[str] = None) -> "BarramentoMedidas":
+        """Cria o segmento (processo do solver)."""
+        tamanho = 8 * (_CABECALHO + 2 * (_CABECALHO_SLOT + int(n_medidas)))
+        shm = shared_memory.SharedMemory(name=nome, create=True, size=tamanho)
+        cabecalho = np.ndarray((_CABECALHO,), dtype=np.int64, buffer=shm.buf)
+        cabecalho[:] = [0, int(n_medidas), 0, 0]
+        barramento = cls(shm, criador=True)
+        for seq, dados in zip(barramento._seq, barramento._dados):
+            seq[:] = 0
+            dados[:] = np.nan
+        return barramento
+
+    @classmethod
+    def anexar(cls, nome: str) -> "BarramentoMedidas":
+        """Anexa a um segmento existente (processos dos servidores)."""
+        return cls(shared_memory.SharedMemory(name=nome), criador=False)
+
+    @property
+    def nome(self) -> str:
+        return self._shm.name
+
+    @property
+    def n_medidas(self) -> int:
+        return len(self._dados[0])
+
+    @property
+    def publicacoes(self) -> int:
+        return int(self._cabecalho[2])
+
+    def publicar(self, valores: Sequence[float]) -> None:
+        """Escreve no slot inativo e o torna o atual (apenas um escritor)."""
+        slot = 1 - int(self._cabecalho[0])
+        publicacao = int(self._cabecalho[2]) + 1
+        self._seq[slot][0] += 1  # ímpar: escrita em andamento
+        self._dados[slot][:] = valores
+        self._seq[slot][1] = publicacao
+        self._seq[slot][0] += 1  # par: slot consistente
+        self._cabecalho[0] = slot
+        self._cabecalho[2] = publicacao
+
+    def ler(self, destino: Optional[np.ndarray] = None) -> Tuple[int, np.ndarray]:
+        """
+        Copia um snapshot consistente do vetor atual para destino.
+
+        Retorna (publicacao, destino); a publicação é a gravada no próprio
+        slot, validada pelo seqlock junto com os dados. Passe um destino
+        pré-alocado para não alocar memória a cada leitura.
+        """
+        if destino is None:
+            destino = np.empty(self.n_medidas)
+        while True:
+            slot = int(self._cabecalho[0])
+            antes = int(self._seq[slot][0])
+            if antes % 2:
+                continue
+            np.copyto(destino, self._dados[slot])
+            publicacao = int(self._seq[slot][1])
+            if int(self._seq[slot][0]) == antes:
+                return publicacao, destino
+
+    def fechar(self) -> None:
+        """Libera as views e desanexa; o criador também remove o segmento."""
+        self._cabecalho = None
+        self._seq = []
+        self._dados = []
+        self._shm.close()
+        if self._criador:
+            self._shm.unlink()
+
+
+class AnelComandos:
+    """Fila circular SPSC em memória compartilhada: (endereco, valor, t_escrita)."""
+
+    CAMPOS = 3
+
+    def __init__(
+        self, shm: shared_memory.SharedMemory, criador: bool, campainha=None
+    ) -> None:
+        """
+        campainha: multiprocessing.Event opcional, sinalizado a cada envio
+                   para acordar o consumidor sem polling.
+        """
+        self._shm = shm
+        self._criador = criador
+        self.campainha = campainha
+        # [cabeca (produtor), cauda (consumidor), capacidade]
+        self._indices = np.ndarray((3,), dtype=np.int64, buffer=shm.buf)
+        capacidade = int(self._indices[2])
+        self._registros = np.ndarray(
+            (capacidade, self.CAMPOS), dtype=np.float64, buffer=shm.buf, offset=3 * 8
+        )
+
+    @classmethod
+    def criar(cls, capacidade: int = 256, nome: Optional[str] = None, campainha=None):
+        tamanho = 8 * (3 + int(capacidade) * cls.CAMPOS)
+        shm = shared_memory.SharedMemory(name=nome, create=True, size=tamanho)
+        indices = np.ndarray((3,), dtype=np.int64, buffer=shm.buf)
+        indices[:] = [0, 0, int(capacidade)]
+        return cls(shm, criador=True, campainha=campainha)
+
+    @classmethod
+    def anexar(cls, nome: str, campainha=None) -> "AnelComandos":
+        return cls(
+            shared_memory.SharedMemory(name=nome), criador=False, campainha=campainha
+        )
+
+    @property
+    def nome(self) -> str:
+        return self._shm.name
+
+    @property
+    def capacidade(self) -> int:
+        return len(self._registros)
+
+    def __len__(self) -> int:
+        return int(self._indices[0] - self._indices[1])
+
+    def enviar(
+        self, endereco: int, valor: int, t_escrita: Optional[float] = None
+    ) -> bool:
+        """Produtor: grava um comando. Retorna False se o anel estiver cheio."""
+        cabeca = int(self._indices[0])
+        if cabeca - int(self._indices[1]) >= self.capacidade:
+            return False
+        if t_escrita is None:
+            t_escrita = time.perf_counter()
+        self._registros[cabeca % self.capacidade] = (endereco, valor, t_escrita)
+        self._indices[0] = cabeca + 1  # publica o registro
+        if self.campainha is not None:
+            self.campainha.set()
+        return True
+
+    def retirar_todos(self) -> List[Tuple[int, int, float]]:
+        """Consumidor: devolve os comandos pendentes na ordem de envio."""
+        cauda = int(self._indices[1])
+        cabeca = int(self._indices[0])
+        comandos = []
+        for i in range(cauda, cabeca):
+            endereco, valor, t_escrita = self._registros[i % self.capacidade]
+            comandos.append((int(endereco), int(valor), float(t_escrita)))
+        self._indices[1] = cabeca  # libera os slots
+        return comandos
+
+    def fechar(self) -> None:
+        self._indices = None
+        self._registros = None
+        self._shm.close()
+        if self._criador:
+            self._shm.unlink()
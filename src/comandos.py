@@ -0,0 +1,148 @@
+# src/comandos.py
+"""
+Caminho de comandos SCADA -> modelo da rede.
+
+Funcionalidade:
+- Mapear os pontos de 'Comandos' do pontos.json para endereços de coil.
+- Enfileirar, de forma thread-safe, os comandos recebidos (Modbus, teclado).
+- Acordar o loop de simulação imediatamente quando chega um comando.
+- Medir a latência entre a escrita do comando e a publicação do status.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import queue
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+# Endereço de coil -> (equipamento, tag)
+MapaComandos = Dict[int, Tuple[str, str]]
+
+# pontos.json do repositório, resolvido a partir deste arquivo (não do cwd)
+PONTOS_JSON = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "docs",
+    "modelagem",
+    "pontos.json",
+)
+
+
+class Comando:
+    """Comando recebido de um cliente SCADA ou do teclado."""
+
+    def __init__(
+        self, equipamento: str, tag: str, valor: int, origem: str = "scada"
+    ) -> None:
+        """
+        equipamento: grupo do ponto no pontos.json (ex: "Barra", "Disjuntor").
+        tag: tag do comando (ex: "CO_CLOSE_BUS_TIE").
+        valor: valor escrito no coil.
+        origem: quem emitiu o comando (ex: "modbus", "teclado").
+        """
+        self.equipamento = equipamento
+        self.tag = tag
+        self.valor = int(valor)
+        self.origem = origem
+        self.t_escrita = time.perf_counter()
+
+    def __repr__(self) -> str:
+        return (
+            f"Comando({self.equipamento}.{self.tag}={self.valor}, origem={self.origem})"
+        )
+
+
+class EstatisticasLatencia:
+    """Acumula a latência comando -> status."""
+
+    def __init__(self) -> None:
+        self.amostras = 0
+        self.latencia_max_s = 0.0
+        self._latencia_soma_s = 0.0
+
+    @property
+    def latencia_media_s(self) -> float:
+        return self._latencia_soma_s / self.amostras if self.amostras else 0.0
+
+    def registrar(self, latencia_s: float) -> None:
+        self.amostras += 1
+        self._latencia_soma_s += latencia_s
+        if latencia_s > self.latencia_max_s:
+            self.latencia_max_s = latencia_s
+
+    def __repr__(self) -> str:
+        return (
+            f"EstatisticasLatencia(amostras={self.amostras}, "
+            f"media={self.latencia_media_s * 1e3:.2f} ms, "
+            f"max={self.latencia_max_s * 1e3:.2f} ms)"
+        )
+
+
+def mapear_comandos(pontos: Dict, endereco_inicial: int = 2) -> MapaComandos:
+    """
+    Atribui endereços de coil sequenciais aos pontos de 'Comandos'.
+
+    A ordem segue o pontos.json (equipamento, depois comando), então o
+    mapa é estável enquanto o arquivo não mudar.
+    """
+    mapa: MapaComandos = {}
+    endereco = int(endereco_inicial)
+    for equipamento, conteudo in pontos.items():
+        for ponto in conteudo.get("Comandos", []):
+            if not ponto or "tag" not in ponto:
+                continue
+            mapa[endereco] = (equipamento, ponto["tag"])
+            endereco += 1
+    return mapa
+
+
+def carregar_comandos(
+    caminho: str = PONTOS_JSON, endereco_inicial: int = 2
+) -> MapaComandos:
+    """Lê o pontos.json e devolve o mapa de coils de comando."""
+    with open(caminho, "r", encoding="utf-8") as fp:
+        pontos = json.load(fp)
+    return mapear_comandos(pontos, endereco_inicial)
+
+
+class FilaComandos:
+    """Fila thread-safe de comandos com sinalização para o loop de simulação."""
+
+    def __init__(self) -> None:
+        self._fila: "queue.Queue[Comando]" = queue.Queue()
+        self._novo_comando = threading.Event()
+        self.latencia = EstatisticasLatencia()
+
+    @property
+    def evento(self) -> threading.Event:
+        """Sinalizado a cada comando; usar em AgendadorCiclos.esperar(acordar=...)."""
+        return self._novo_comando
+
+    def enfileirar(self, comando: Comando) -> None:
+        """Chamado pelas threads dos protocolos; acorda o loop de simulação."""
+        self._fila.put(comando)
+        self._novo_comando.set()
+
+    def aguardar(self, timeout: Optional[float] = None) -> bool:
+        """Bloqueia até chegar um comando ou expirar o timeout. True se houver comando."""
+        if timeout is not None and timeout <= 0:
+            return self._novo_comando.is_set()
+        return self._novo_comando.wait(timeout)
+
+    def retirar_todos(self) -> List[Comando]:
+        """Esvazia a fila e devolve os comandos pendentes na ordem de chegada."""
+        self._novo_comando.clear()
+        comandos = []
+        while True:
+            try:
+                comandos.append(self._fila.get_nowait())
+            except queue.Empty:
+                return comandos
+
+    def confirmar(self, comando: Comando) -> float:
+        """Registra que o status do comando foi publicado; devolve a latência."""
+        latencia = time.perf_counter() - comando.t_escrita
+        self.latencia.registrar(latencia)
+        return latencia
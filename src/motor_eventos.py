@@ -7,17 +7,24 @@ Funcionalidade:
 - Atualizar estados de equipamentos (equipamento.parametros['estado']).
 - Notificar o SCADA via callback quando ocorrerem eventos/estados.
 - Opcional: disparar cálculo de fluxo de potência via pandapower_integration.run_powerflow.
+- Opcional: agendar abertura/religamento calculados pelo motor de proteção.
+- Opcional: manter as ilhas (ProcessadorTopologia) e notificar DI_BARRA_ENERGIZADA.
 """
 
 from __future__ import annotations
 
+import heapq
+import itertools
 import json
 import logging
 import threading
 import time
 from typing import Callable, Dict, Iterable, List, Optional
 
-from utils import Logger
+try:
+    from utils import Logger
+except ImportError:  # importado como pacote (src.motor_eventos)
+    from src.utils import Logger
 
 try:
     from pandapower_integration import run_powerflow  # type: ignore
@@ -65,19 +72,35 @@ class MotorEventos:
         rede: Dict[str, List],
         scada_callback: Optional[ScadaCallback] = None,
         enable_powerflow: bool = False,
+        protecao=None,
+        topologia=None,
     ) -> None:
         """
         rede: dicionário com listas de objetos carregados
               (ex: {'barras': [...], 'linhas': [...], 'equipamentos': [...]})
         scada_callback: função que recebe notificações de eventos para o SCADA
         enable_powerflow: se True e se run_powerflow existir, roda fluxo após eventos
+        protecao: MotorProtecao opcional; em 'falha_linha' seus disparos
+                  (abertura/religamento) são agendados automaticamente e os
+                  religadores com parametros['linha_id'] abrem/fecham a
+                  linha na rede da proteção
+        topologia: ProcessadorTopologia opcional; linhas em falha e religadores
+                   com parametros['linha_id'] atualizam a conectividade
         """
         self.logger = Logger("motor_eventos")
         self.rede = rede
         self.scada_callback = scada_callback
         self.enable_powerflow = bool(enable_powerflow) and (run_powerflow is not None)
+        self.protecao = protecao
+        self.topologia = topologia
         self._stop_event = threading.Event()
         self._thread: Optional[threading.Thread] = None
+        # fila de eventos pendentes: (tempo_offset_s, seq, evento)
+        self._fila: List = []
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        # sinalizado por agendar()/stop() para interromper a espera do próximo evento
+        self._novo_evento = threading.Event()
 
     # --------------------------
     # Utilitários de busca
@@ -129,6 +152,21 @@ class MotorEventos:
         }
         self._notificar_scada("estado_equipamento", payload)
 
+    def _atualizar_topologia(self, ramo, ativo: bool) -> None:
+        """Abre/fecha o ramo na topologia e notifica as barras que mudaram."""
+        if self.topologia is None:
+            return
+        try:
+            mudaram = self.topologia.definir_ramo(ramo, ativo)
+        except KeyError:
+            self.logger.warning("Ramo %s não existe na topologia", ramo)
+            return
+        for barra in sorted(mudaram):
+            self._notificar_scada(
+                "DI_BARRA_ENERGIZADA",
+                {"barra_id": barra, "valor": self.topologia.energizada(barra)},
+            )
+
     def _rodar_powerflow_se_for_codigo(self) -> None:
         """Roda o pandapower se estiver habilitado e anexa resultados aos logs."""
         if not self.enable_powerflow:
@@ -162,6 +200,10 @@ class MotorEventos:
                 "falha_linha",
                 {"linha_id": linha.id, "origem": linha.barra_origem, "destino": linha.barra_destino},
             )
+            self._atualizar_topologia(("linha", linha.id), False)
+            # a linha segue conectada na rede da proteção até um religador abri-la
+            barra_falta = evento.parametros.get("barra", linha.barra_destino)
+            self._agendar_protecao(barra_falta, evento.tempo_offset_s)
 
         elif evento.tipo in ("abertura_religador", "falha_religador"):
             eq = self._find_equipamento(evento.alvo_id)
@@ -169,7 +211,12 @@ class MotorEventos:
                 self.logger.warning("Equipamento id=%s não encontrado", evento.alvo_id)
                 return
             novo_estado = "aberto" if evento.tipo == "abertura_religador" else "falha"
+            if evento.parametros.get("bloqueio"):
+                novo_estado = "bloqueado"  # tentativas de religamento esgotadas
             self._atualizar_estado_equipamento(eq, novo_estado, motivo=evento.tipo)
+            if eq.parametros.get("linha_id") is not None:
+                self._atualizar_topologia(("linha", eq.parametros["linha_id"]), False)
+                self._atualizar_linha_protecao(eq.parametros["linha_id"], False)
 
         elif evento.tipo == "restauracao_religador":
             eq = self._find_equipamento(evento.alvo_id)
@@ -177,6 +224,19 @@ class MotorEventos:
                 self.logger.warning("Equipamento id=%s não encontrado", evento.alvo_id)
                 return
             self._atualizar_estado_equipamento(eq, "fechado", motivo="restauracao")
+            linha_id = eq.parametros.get("linha_id")
+            if linha_id is not None:
+                self._atualizar_linha_protecao(linha_id, True)
+                linha = self._find_linha(linha_id)
+                if linha is not None and getattr(linha, "estado", None) == "fora":
+                    # religou sobre a falta permanente: a linha continua aberta
+                    # e a proteção atua de novo (ou bloqueia o religador)
+                    self.logger.info("Religamento sobre a linha %s em falha", linha_id)
+                    barra_falta = evento.parametros.get("barra_falta", linha.barra_destino)
+                    tentativa = evento.parametros.get("tentativa", 1)
+                    self._agendar_protecao(barra_falta, evento.tempo_offset_s, tentativa)
+                else:
+                    self._atualizar_topologia(("linha", linha_id), True)
 
         elif evento.tipo == "transformador_saida":
             eq = self._find_equipamento(evento.alvo_id)
@@ -196,33 +256,83 @@ class MotorEventos:
         # opcional: rodar fluxo de potência e salvar histórico
         self._rodar_powerflow_se_for_codigo()
 
+    def _atualizar_linha_protecao(self, linha_id: int, em_servico: bool) -> None:
+        """Reflete a manobra do religador na rede usada pelo cálculo de curto."""
+        if self.protecao is None:
+            return
+        try:
+            self.protecao.definir_linha(linha_id, em_servico)
+        except KeyError:
+            self.logger.warning("Linha %s não existe na rede da proteção", linha_id)
+
+    def _agendar_protecao(self, barra_id: int, t0: float, tentativa: int = 0) -> None:
+        """Converte os disparos da proteção para a falta em eventos agendados."""
+        if self.protecao is None:
+            return
+        try:
+            disparos = self.protecao.disparos_para_falha(barra_id, t0, tentativa)
+        except Exception:  # pragma: no cover - externo
+            self.logger.exception("Erro ao avaliar a proteção para a barra %s", barra_id)
+            return
+        for d in disparos:
+            self.logger.info("Proteção agendou %s", d)
+            self.agendar(Evento(d.tempo_offset_s, d.tipo, d.alvo_id, d.parametros))
+
     # --------------------------
     # Agendamento/Execução
     # --------------------------
+    def agendar(self, evento: Evento) -> None:
+        """Insere um evento na fila (pode ser chamado durante a execução)."""
+        with self._lock:
+            heapq.heappush(self._fila, (evento.tempo_offset_s, next(self._seq), evento))
+        self._novo_evento.set()
+
+    def _proximo_evento(self) -> Optional[Evento]:
+        with self._lock:
+            return self._fila[0][2] if self._fila else None
+
     def run_scenario(self, eventos: Iterable[Evento], realtime: bool = True) -> None:
         """
         Executa os eventos do cenário.
 
         realtime=True -> usa os offsets em segundos reais.
         realtime=False -> executa eventos o mais rápido possível seguindo a ordem.
+        Os eventos do cenário se juntam aos já agendados via agendar(); eventos
+        agendados durante a execução (ex: pela proteção) entram na mesma fila.
         """
-        ev_list = sorted(list(eventos), key=lambda e: e.tempo_offset_s)
+        for ev in eventos:
+            self.agendar(ev)
 
         start_ts = time.time()
-        self.logger.info("Iniciando cenário com %d eventos", len(ev_list))
+        with self._lock:
+            pendentes = len(self._fila)
+        self.logger.info("Iniciando cenário com %d eventos", pendentes)
 
-        for ev in ev_list:
+        while True:
             if self._stop_event.is_set():
                 self.logger.info("Execução interrompida.")
                 break
 
+            self._novo_evento.clear()
+            ev = self._proximo_evento()
+            if ev is None:
+                break
+
             if realtime:
                 target = start_ts + ev.tempo_offset_s
                 now = time.time()
                 wait = target - now
                 if wait > 0:
                     self.logger.debug("Aguardando %.3fs para o próximo evento", wait)
-                    time.sleep(wait)
+                    if self._novo_evento.wait(wait):
+                        # fila mudou durante a espera: reavalia o próximo evento
+                        continue
+
+            with self._lock:
+                if self._fila[0][2] is not ev:
+                    # um evento anterior foi agendado durante a espera
+                    continue
+                heapq.heappop(self._fila)
 
             # Executa o evento
             self._executar_evento(ev)
@@ -242,8 +352,11 @@ class MotorEventos:
         self.logger.debug("Motor iniciado em thread.")
 
     def stop(self, timeout: Optional[float] = None) -> None:
-        """Solicita parada e aguarda finalização da thread (se houver)."""
+        """Solicita parada, aguarda a thread (se houver) e descarta os eventos pendentes."""
         self._stop_event.set()
+        self._novo_evento.set()
         if self._thread:
             self._thread.join(timeout)
             self.logger.debug("Thread finalizada (join).")
+        with self._lock:
+            self._fila = []
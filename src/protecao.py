@@ -0,0 +1,244 @@
+# src/protecao.py
+"""
+Motor de proteção (sobrecorrente de tempo inverso) do simulador.
+
+Funcionalidade:
+- Calcular as correntes de curto por barra com o pandapower.shortcircuit,
+  uma única vez por topologia (cache pelo estado de chaves, ramos e fontes).
+- Refletir na rede as aberturas/fechamentos de linhas feitos pelo
+  MotorEventos, para que o cache acompanhe a topologia após cada atuação.
+- Avaliar as curvas IEC de todos os relés de uma vez com NumPy, gerando a
+  matriz de tempos de atuação (relé x barra em falta).
+- Converter a atuação em disparos de abertura/religamento para o MotorEventos,
+  com bloqueio (lockout) do religador após esgotar as tentativas.
+"""
+
+from __future__ import annotations
+
+from typing import Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+
+try:
+    import pandapower.shortcircuit as sc  # type: ignore
+except Exception:
+    sc = None  # type: ignore
+
+# Constantes das curvas IEC 60255: t = TMS * k / ((I/Ip)^alpha - 1)
+CURVAS_IEC = {
+    "IEC_NI": (0.14, 0.02),  # normalmente inversa
+    "IEC_VI": (13.5, 1.0),  # muito inversa
+    "IEC_EI": (80.0, 2.0),  # extremamente inversa
+    "IEC_LTI": (120.0, 1.0),  # inversa de tempo longo
+}
+
+TIPOS_RELE = ("rele_protecao", "religador")
+
+# Função que recebe a rede pandapower e devolve Ikss (kA) por barra
+CalculoCurto = Callable[[object], np.ndarray]
+
+
+def calcular_ikss_ka(net) -> np.ndarray:
+    """Curto trifásico máximo em todas as barras (kA, na ordem de net.bus.index)."""
+    if sc is None:
+        raise RuntimeError("pandapower.shortcircuit não está disponível")
+    sc.calc_sc(net, case="max")
+    return (
+        net.res_bus_sc.ikss_ka.reindex(net.bus.index).fillna(0.0).to_numpy(dtype=float)
+    )
+
+
+# Tabelas cujo in_service altera as correntes de curto (ramos e fontes)
+TABELAS_TOPOLOGIA = (
+    "bus",
+    "line",
+    "trafo",
+    "trafo3w",
+    "impedance",
+    "ext_grid",
+    "gen",
+    "sgen",
+)
+
+
+def chave_topologia(net) -> bytes:
+    """Identifica a topologia pelo estado de chaves, barras, ramos e fontes."""
+    partes = [net.switch.closed.to_numpy(dtype=bool)]
+    for tabela in TABELAS_TOPOLOGIA:
+        if tabela in net:
+            partes.append(net[tabela].in_service.to_numpy(dtype=bool))
+    tamanhos = np.array([len(p) for p in partes], dtype=np.int64)
+    return tamanhos.tobytes() + b"".join(np.packbits(p).tobytes() for p in partes)
+
+
+class Disparo:
+    """Ação gerada pela proteção, a ser convertida em Evento pelo MotorEventos."""
+
+    def __init__(
+        self, tempo_offset_s: float, tipo: str, alvo_id: int, parametros: Dict
+    ) -> None:
+        self.tempo_offset_s = float(tempo_offset_s)
+        self.tipo = tipo
+        self.alvo_id = int(alvo_id)
+        self.parametros = parametros
+
+    def __repr__(self) -> str:
+        return f"Disparo(t={self.tempo_offset_s:.3f}s, tipo={self.tipo}, alvo={self.alvo_id})"
+
+
+class MotorProtecao:
+    """Avalia todos os relés de sobrecorrente de forma vetorizada."""
+
+    def __init__(
+        self,
+        net,
+        equipamentos: Iterable,
+        mapa_barras: Optional[Dict[int, int]] = None,
+        calcular_curto: CalculoCurto = calcular_ikss_ka,
+        mapa_linhas: Optional[Dict[int, int]] = None,
+    ) -> None:
+        """
+        net: rede pandapower usada no cálculo de curto-circuito.
+        equipamentos: objetos Equipamento; são considerados os de tipo
+                      'rele_protecao' ou 'religador'. Parâmetros aceitos:
+                      pickup_a (obrigatório), tms (padrão 0.1),
+                      curva (padrão 'IEC_NI'), barras (barras protegidas,
+                      padrão [barra]), alvo_id (equipamento a abrir,
+                      padrão o próprio relé), religamento_s (opcional),
+                      max_religamentos (padrão 1; tentativas antes do
+                      bloqueio).
+        mapa_barras: id da Barra -> índice da barra no pandapower
+                     (padrão: ids iguais aos índices).
+        calcular_curto: substitui o cálculo de Ikss (ex: em testes).
+        mapa_linhas: id da Linha -> índice da linha no pandapower
+                     (padrão: ids iguais aos índices).
+        """
+        self.net = net
+        self.mapa_barras = mapa_barras or {}
+        self.mapa_linhas = mapa_linhas or {}
+        self.calcular_curto = calcular_curto
+        self._cache: Dict[bytes, np.ndarray] = {}
+
+        self.reles = [e for e in equipamentos if getattr(e, "tipo", None) in TIPOS_RELE]
+        n_barras = len(net.bus.index)
+
+        self.pickup_a = np.empty(len(self.reles))
+        self.tms = np.empty(len(self.reles))
+        self.k = np.empty(len(self.reles))
+        self.alpha = np.empty(len(self.reles))
+        self.religamento_s = np.full(len(self.reles), np.nan)
+        self.max_religamentos = np.ones(len(self.reles), dtype=np.int64)
+        self.alvos = np.empty(len(self.reles), dtype=np.int64)
+        # visibilidade[r, b] = relé r enxerga falta na barra b
+        self.visibilidade = np.zeros((len(self.reles), n_barras), dtype=bool)
+
+        for i, rele in enumerate(self.reles):
+            p = rele.parametros
+            curva = p.get("curva", "IEC_NI")
+            if curva not in CURVAS_IEC:
+                raise ValueError(f"Curva desconhecida para o relé {rele.id}: {curva}")
+            self.pickup_a[i] = float(p["pickup_a"])
+            self.tms[i] = float(p.get("tms", 0.1))
+            self.k[i], self.alpha[i] = CURVAS_IEC[curva]
+            if p.get("religamento_s") is not None:
+                self.religamento_s[i] = float(p["religamento_s"])
+            self.max_religamentos[i] = int(p.get("max_religamentos", 1))
+            self.alvos[i] = int(p.get("alvo_id", rele.id))
+            barras = p.get("barras", [rele.barra])
+            self.visibilidade[i, self._posicoes(barras)] = True
+
+    def _posicoes(self, barras_id: Iterable[int]) -> np.ndarray:
+        """Converte ids de Barra em posições de net.bus.index."""
+        indices = [self.mapa_barras.get(int(b), int(b)) for b in barras_id]
+        posicoes = self.net.bus.index.get_indexer(indices)
+        if (posicoes < 0).any():
+            raise KeyError(f"Barra(s) inexistente(s) na rede: {list(barras_id)}")
+        return posicoes
+
+    # --------------------------
+    # Curvas e cache
+    # --------------------------
+    def tempos_atuacao(self, correntes_a: np.ndarray) -> np.ndarray:
+        """
+        Tempo de atuação (s) de cada relé para as correntes dadas.
+
+        correntes_a: vetor (n_reles,) ou matriz (n_reles, n_casos) em ampères.
+        Retorna np.inf onde a corrente não supera o pickup.
+        """
+        correntes_a = np.asarray(correntes_a, dtype=float)
+        extra = (slice(None),) + (None,) * (correntes_a.ndim - 1)
+        multiplo = correntes_a / self.pickup_a[extra]
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            tempos = (
+                self.tms[extra] * self.k[extra] / (multiplo ** self.alpha[extra] - 1.0)
+            )
+        return np.where(multiplo > 1.0, tempos, np.inf)
+
+    def matriz_tempos(self) -> np.ndarray:
+        """Matriz (n_reles, n_barras) de tempos de atuação, cacheada por topologia."""
+        chave = chave_topologia(self.net)
+        tempos = self._cache.get(chave)
+        if tempos is None:
+            ikss_a = np.asarray(self.calcular_curto(self.net), dtype=float) * 1000.0
+            tempos = self.tempos_atuacao(self.visibilidade * ikss_a[None, :])
+            self._cache[chave] = tempos
+        return tempos
+
+    def limpar_cache(self) -> None:
+        self._cache.clear()
+
+    def definir_linha(self, linha_id: int, em_servico: bool) -> None:
+        """Coloca a linha em/fora de serviço na rede (muda a chave do cache)."""
+        indice = self.mapa_linhas.get(int(linha_id), int(linha_id))
+        if indice not in self.net.line.index:
+            raise KeyError(f"Linha inexistente na rede: {linha_id}")
+        self.net.line.at[indice, "in_service"] = bool(em_servico)
+
+    # --------------------------
+    # Geração de disparos
+    # --------------------------
+    def disparos_para_falha(
+        self, barra_id: int, t0: float = 0.0, tentativa: int = 0
+    ) -> List[Disparo]:
+        """
+        Disparos causados por uma falta na barra informada.
+
+        Abre o(s) relé(s) mais rápido(s) (coordenação: quem atua primeiro
+        elimina a falta) e agenda o religamento se configurado.
+        tentativa: religamentos já feitos sobre esta falta; esgotado
+                   max_religamentos, a abertura sai com parametros['bloqueio'].
+        """
+        if not self.reles:
+            return []
+        coluna = self._posicoes([barra_id])[0]
+        tempos = self.matriz_tempos()[:, coluna]
+        t_min = tempos.min()
+        if not np.isfinite(t_min):
+            return []
+
+        disparos = []
+        for i in np.flatnonzero(tempos <= t_min + 1e-9):
+            params = {
+                "rele_id": self.reles[i].id,
+                "barra_falta": int(barra_id),
+                "tempo_atuacao_s": float(tempos[i]),
+                "tentativa": int(tentativa),
+            }
+            religa = np.isfinite(self.religamento_s[i])
+            if religa and tentativa >= self.max_religamentos[i]:
+                religa = False
+                params["bloqueio"] = True
+            t_abertura = t0 + float(tempos[i])
+            disparos.append(
+                Disparo(t_abertura, "abertura_religador", self.alvos[i], params)
+            )
+            if religa:
+                disparos.append(
+                    Disparo(
+                        t_abertura + float(self.religamento_s[i]),
+                        "restauracao_religador",
+                        self.alvos[i],
+                        dict(params, tentativa=int(tentativa) + 1),
+                    )
+                )
+        return disparos
@@ -0,0 +1,488 @@
+# src/topologia.py
+"""
+Processador de topologia incremental com detecção de ilhas.
+
+Funcionalidade:
+- Manter a conectividade das barras enquanto chaves e linhas mudam de estado:
+    * fechar um ramo une dois componentes (relabel do menor, união por tamanho);
+    * abrir um ramo faz uma busca bidirecional intercalada entre as duas
+      pontas, que termina ao esgotar o lado menor.
+- Saber em O(1) se uma barra está energizada (componente com fonte).
+- Acompanhar a rede pandapower comparando só as colunas de estado (chaves e
+  in_service); fontes que entram/saem de serviço mudam a energização.
+- Desligar as barras mortas na rede pandapower, zerar seus resultados e
+  enviar ao fluxo de potência apenas as ilhas energizadas.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from typing import (
+    AbstractSet,
+    Callable,
+    Dict,
+    FrozenSet,
+    Hashable,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
+
+import numpy as np
+
+# Identificador de ramo: ex. ("linha", 3), ("trafo", 0), ("chave", 2),
+# ("impedancia", 1), ("trafo3w", 0, "hv-mv")
+Ramo = Hashable
+
+# Tabelas de resultado zeradas quando nenhuma ilha está energizada
+TABELAS_RESULTADO = (
+    "bus",
+    "line",
+    "trafo",
+    "trafo3w",
+    "impedance",
+    "load",
+    "sgen",
+    "gen",
+    "ext_grid",
+    "shunt",
+)
+
+
+class ProcessadorTopologia:
+    """Componentes conexos de barras, atualizados a cada manobra."""
+
+    def __init__(self, barras: Iterable[int], fontes: Iterable[int] = ()) -> None:
+        """
+        barras: ids das barras.
+        fontes: barras com fonte (rede externa/gerador de referência).
+        """
+        self._ramos: Dict[Ramo, Tuple[int, int, bool]] = {}
+        self._adjacencia: Dict[int, Set[Ramo]] = {int(b): set() for b in barras}
+        self._fontes: Set[int] = {int(f) for f in fontes}
+        # cada barra começa isolada no próprio componente
+        self._componente: Dict[int, int] = {b: b for b in self._adjacencia}
+        self._membros: Dict[int, Set[int]] = {b: {b} for b in self._adjacencia}
+        self._n_fontes: Dict[int, int] = {
+            b: int(b in self._fontes) for b in self._adjacencia
+        }
+        self._proximo_id = max(self._adjacencia, default=-1) + 1
+        # caches invalidados quando a energização de alguma barra muda
+        self._mortas: Optional[FrozenSet[int]] = None
+        self._estado: Optional[Dict[int, bool]] = None
+        # colunas de estado da rede pandapower na última sincronização
+        self._assinatura: Optional[np.ndarray] = None
+        self._mapa: Optional[_MapaPandapower] = None
+
+    # --------------------------
+    # Construção
+    # --------------------------
+    @classmethod
+    def de_objetos(cls, rede: Dict[str, List], fontes: Iterable[int] = ()):
+        """
+        Monta a partir das listas de objetos do MotorEventos.
+        Linhas com estado 'fora' começam abertas; barras de tipo 'slack'
+        são consideradas fontes além das informadas.
+        """
+        barras = rede.get("barras", [])
+        fontes = set(fontes) | {
+            b.id for b in barras if getattr(b, "tipo", "") == "slack"
+        }
+        topologia = cls([b.id for b in barras], fontes)
+        for linha in rede.get("linhas", []):
+            ativo = getattr(linha, "estado", "dentro") != "fora"
+            topologia.adicionar_ramo(
+                ("linha", linha.id), linha.barra_origem, linha.barra_destino, ativo
+            )
+        return topologia
+
+    @classmethod
+    def de_pandapower(cls, net) -> "ProcessadorTopologia":
+        """
+        Monta a partir de uma rede pandapower (linhas, trafos de 2 e 3
+        enrolamentos, impedâncias e chaves). A estrutura (barras e ramos)
+        fica fixa; sincronizar() acompanha apenas os estados.
+        """
+        mapa = _MapaPandapower(net)
+        assinatura = _assinatura_pandapower(net)
+        topologia = cls(net.bus.index, _fontes_pandapower(net))
+        for ramo, (a, b) in mapa.ramos.items():
+            topologia.adicionar_ramo(ramo, a, b, mapa.ativo(ramo, assinatura))
+        topologia._mapa = mapa
+        topologia._assinatura = assinatura
+        return topologia
+
+    def adicionar_ramo(
+        self, ramo: Ramo, barra_a: int, barra_b: int, ativo: bool = True
+    ) -> None:
+        self._ramos[ramo] = (int(barra_a), int(barra_b), False)
+        self._adjacencia[int(barra_a)].add(ramo)
+        self._adjacencia[int(barra_b)].add(ramo)
+        if ativo:
+            self.definir_ramo(ramo, True)
+
+    # --------------------------
+    # Atualização incremental
+    # --------------------------
+    def definir_ramo(self, ramo: Ramo, ativo: bool) -> Set[int]:
+        """Abre/fecha um ramo e devolve as barras cuja energização mudou."""
+        a, b, atual = self._ramos[ramo]
+        ativo = bool(ativo)
+        if atual == ativo:
+            return set()
+        self._ramos[ramo] = (a, b, ativo)
+        self._assinatura = None  # mudança fora de sincronizar(): reavaliar tudo
+        if a == b:  # laço na própria barra não altera a conectividade
+            return set()
+        mudaram = self._unir(a, b) if ativo else self._separar(a, b)
+        if mudaram:
+            self._invalidar_cache()
+        return mudaram
+
+    def definir_fontes(self, fontes: Iterable[int]) -> Set[int]:
+        """Substitui o conjunto de barras com fonte; devolve as barras que mudaram."""
+        fontes = {int(f) for f in fontes}
+        if fontes == self._fontes:
+            return set()
+        self._assinatura = None
+        alteradas = (fontes - self._fontes) | (self._fontes - fontes)
+        antes = {
+            self._componente[f]: self._n_fontes[self._componente[f]] > 0
+            for f in alteradas
+        }
+        for barra in fontes - self._fontes:
+            self._n_fontes[self._componente[barra]] += 1
+        for barra in self._fontes - fontes:
+            self._n_fontes[self._componente[barra]] -= 1
+        self._fontes = fontes
+
+        mudaram: Set[int] = set()
+        for comp, energizado in antes.items():
+            if energizado != (self._n_fontes[comp] > 0):
+                mudaram |= self._membros[comp]
+        if mudaram:
+            self._invalidar_cache()
+        return mudaram
+
+    def _invalidar_cache(self) -> None:
+        self._mortas = None
+        self._estado = None
+
+    def _unir(self, a: int, b: int) -> Set[int]:
+        ca, cb = self._componente[a], self._componente[b]
+        if ca == cb:
+            return set()
+        energizada_a, energizada_b = self._n_fontes[ca] > 0, self._n_fontes[cb] > 0
+        mudaram: Set[int] = set()
+        if energizada_a != energizada_b:
+            mudaram = set(self._membros[cb] if energizada_a else self._membros[ca])
+
+        # união por tamanho: só as barras do componente menor são relabeladas
+        if len(self._membros[ca]) < len(self._membros[cb]):
+            ca, cb = cb, ca
+        for barra in self._membros[cb]:
+            self._componente[barra] = ca
+        self._membros[ca] |= self._membros.pop(cb)
+        self._n_fontes[ca] += self._n_fontes.pop(cb)
+        return mudaram
+
+    def _separar(self, a: int, b: int) -> Set[int]:
+        lado = self._busca_bidirecional(a, b)
+        if lado is None:  # ainda conectadas por outro caminho
+            return set()
+        comp = self._componente[a]
+        novo = self._proximo_id
+        self._proximo_id += 1
+        for barra in lado:
+            self._componente[barra] = novo
+        self._membros[comp] -= lado
+        self._membros[novo] = lado
+        fontes_lado = len(lado & self._fontes)
+        energizado_antes = self._n_fontes[comp] > 0
+        self._n_fontes[comp] -= fontes_lado
+        self._n_fontes[novo] = fontes_lado
+
+        if not energizado_antes:
+            return set()
+        if fontes_lado == 0:
+            return set(lado)
+        if self._n_fontes[comp] == 0:
+            return set(self._membros[comp])
+        return set()
+
+    def _busca_bidirecional(self, a: int, b: int) -> Optional[Set[int]]:
+        """
+        Expande a partir de a e de b alternadamente pelos ramos ativos.
+        Devolve as barras do lado que se esgotou primeiro (o menor) ou
+        None se as duas buscas se encontrarem.
+        """
+        visitados = ({a}, {b})
+        filas = (deque([a]), deque([b]))
+        while True:
+            for lado in (0, 1):
+                if not filas[lado]:
+                    return visitados[lado]
+                barra = filas[lado].popleft()
+                for ramo in self._adjacencia[barra]:
+                    x, y, ativo = self._ramos[ramo]
+                    if not ativo:
+                        continue
+                    vizinha = y if x == barra else x
+                    if vizinha in visitados[1 - lado]:
+                        return None
+                    if vizinha not in visitados[lado]:
+                        visitados[lado].add(vizinha)
+                        filas[lado].append(vizinha)
+
+    # --------------------------
+    # Consultas
+    # --------------------------
+    def energizada(self, barra: int) -> bool:
+        return self._n_fontes[self._componente[int(barra)]] > 0
+
+    def barras_energizadas(self) -> Set[int]:
+        return {b for c, m in self._membros.items() if self._n_fontes[c] > 0 for b in m}
+
+    def barras_mortas(self) -> AbstractSet[int]:
+        """Barras sem fonte (conjunto em cache até a energização mudar)."""
+        if self._mortas is None:
+            self._mortas = frozenset(
+                b for c, m in self._membros.items() if self._n_fontes[c] == 0 for b in m
+            )
+        return self._mortas
+
+    def estado_barras(self) -> Dict[int, bool]:
+        """Cópia de {barra: energizada}, montada a partir do cache."""
+        if self._estado is None:
+            mortas = self.barras_mortas()
+            self._estado = {b: b not in mortas for b in self._componente}
+        return dict(self._estado)
+
+    def ramos_abertos(self) -> Dict[str, List]:
+        """Ramos inativos agrupados pelo tipo (ex: {'linha': [3], 'trafo': []})."""
+        abertos: Dict[str, List] = {}
+        for ramo, (_, _, ativo) in self._ramos.items():
+            if not ativo and isinstance(ramo, tuple):
+                lista = abertos.setdefault(ramo[0], [])
+                if ramo[1] not in lista:  # trafo3w tem um ramo por par de enrolamentos
+                    lista.append(ramo[1])
+        return abertos
+
+    def ilhas(self) -> List[Tuple[Set[int], bool]]:
+        """Lista de (barras, energizada) por componente."""
+        return [(set(m), self._n_fontes[c] > 0) for c, m in self._membros.items()]
+
+    # --------------------------
+    # Integração com pandapower
+    # --------------------------
+    def sincronizar(self, net) -> Set[int]:
+        """
+        Aplica na topologia os ramos e fontes que mudaram na rede; devolve
+        as barras cuja energização mudou.
+
+        Compara as colunas de estado (chaves e in_service) com a última
+        chamada e reavalia só os ramos ligados às linhas que mudaram. Após
+        um definir_ramo/definir_fontes externo, reavalia todos os ramos.
+        """
+        if self._mapa is None:
+            self._mapa = _MapaPandapower(net)
+        assinatura = _assinatura_pandapower(net)
+        if len(assinatura) != self._mapa.tamanho:
+            raise ValueError("A estrutura da rede mudou; recrie o ProcessadorTopologia")
+
+        if self._assinatura is None:
+            ramos: Iterable[Ramo] = self._mapa.ramos
+            fontes_mudaram = True
+        else:
+            posicoes = np.flatnonzero(assinatura != self._assinatura)
+            if not len(posicoes):
+                return set()
+            ramos = {
+                r for p in posicoes for r in self._mapa.dependentes.get(int(p), ())
+            }
+            fontes_mudaram = self._mapa.afeta_fontes(posicoes)
+
+        mudaram: Set[int] = set()
+        for ramo in ramos:
+            mudaram |= self.definir_ramo(ramo, self._mapa.ativo(ramo, assinatura))
+        if fontes_mudaram:
+            mudaram |= self.definir_fontes(_fontes_pandapower(net))
+        self._assinatura = assinatura
+        return mudaram
+
+
+def _colunas_estado(net) -> List[Tuple[str, object]]:
+    """Colunas que definem o estado dos ramos e das fontes, na ordem da assinatura."""
+    colunas = [("switch", net.switch.closed)]
+    for tabela in ("line", "trafo", "trafo3w", "impedance", "ext_grid", "gen"):
+        if tabela in net:
+            colunas.append((tabela, net[tabela].in_service))
+    if "slack" in net.gen:
+        colunas.append(("gen_slack", net.gen.slack))
+    return colunas
+
+
+def _assinatura_pandapower(net) -> np.ndarray:
+    """Colunas de estado concatenadas em um vetor booleano."""
+    return np.concatenate([np.asarray(c, dtype=bool) for _, c in _colunas_estado(net)])
+
+
+class _MapaPandapower:
+    """
+    Estrutura fixa da rede pandapower: barras de cada ramo e as posições da
+    assinatura (in_service e chaves) que definem se ele está ativo.
+    """
+
+    def __init__(self, net) -> None:
+        self.offset: Dict[str, int] = {}
+        self.tamanho = 0
+        for nome, coluna in _colunas_estado(net):
+            self.offset[nome] = self.tamanho
+            self.tamanho += len(coluna)
+        self._faixas_fontes = [
+            (self.offset[nome], self.offset[nome] + len(coluna))
+            for nome, coluna in _colunas_estado(net)
+            if nome in ("ext_grid", "gen", "gen_slack")
+        ]
+        self.ramos: Dict[Ramo, Tuple[int, int]] = {}
+        # ramo -> (posição do in_service ou None, posições das chaves em série)
+        self._regras: Dict[Ramo, Tuple[Optional[int], Tuple[int, ...]]] = {}
+        # posição da assinatura -> ramos que dependem dela
+        self.dependentes: Dict[int, List[Ramo]] = {}
+
+        # chaves de elemento: (et, elemento) -> [(posição, barra)]
+        chaves: Dict[Tuple[str, int], List[Tuple[int, int]]] = {}
+        sw = net.switch
+        for linha, (idx, et, barra, elemento) in enumerate(
+            zip(sw.index, sw.et, sw.bus, sw.element)
+        ):
+            posicao = self.offset["switch"] + linha
+            if et == "b":
+                self._registrar(("chave", int(idx)), barra, elemento, None, (posicao,))
+            else:
+                chaves.setdefault((et, int(elemento)), []).append((posicao, int(barra)))
+
+        def chaves_de(et, idx):
+            return tuple(p for p, _ in chaves.get((et, int(idx)), ()))
+
+        for linha, (idx, de, para) in enumerate(
+            zip(net.line.index, net.line.from_bus, net.line.to_bus)
+        ):
+            posicao = self.offset["line"] + linha
+            self._registrar(("linha", int(idx)), de, para, posicao, chaves_de("l", idx))
+        for linha, (idx, at, bt) in enumerate(
+            zip(net.trafo.index, net.trafo.hv_bus, net.trafo.lv_bus)
+        ):
+            posicao = self.offset["trafo"] + linha
+            self._registrar(("trafo", int(idx)), at, bt, posicao, chaves_de("t", idx))
+        if "trafo3w" in self.offset:
+            t3w = net.trafo3w
+            for linha, (idx, at, mt, bt) in enumerate(
+                zip(t3w.index, t3w.hv_bus, t3w.mv_bus, t3w.lv_bus)
+            ):
+                # o ponto estrela vira um triângulo: um ramo por par de enrolamentos;
+                # a chave aberta desliga apenas o enrolamento da barra em que está
+                posicao = self.offset["trafo3w"] + linha
+                lados = {"hv": int(at), "mv": int(mt), "lv": int(bt)}
+                for x, y in (("hv", "mv"), ("hv", "lv"), ("mv", "lv")):
+                    em_serie = tuple(
+                        p
+                        for p, barra in chaves.get(("t3", int(idx)), ())
+                        if barra in (lados[x], lados[y])
+                    )
+                    ramo = ("trafo3w", int(idx), f"{x}-{y}")
+                    self._registrar(ramo, lados[x], lados[y], posicao, em_serie)
+        if "impedance" in self.offset:
+            imp = net.impedance
+            for linha, (idx, de, para) in enumerate(
+                zip(imp.index, imp.from_bus, imp.to_bus)
+            ):
+                posicao = self.offset["impedance"] + linha
+                self._registrar(("impedancia", int(idx)), de, para, posicao, ())
+
+    def _registrar(self, ramo, barra_a, barra_b, em_servico, em_serie) -> None:
+        self.ramos[ramo] = (int(barra_a), int(barra_b))
+        self._regras[ramo] = (em_servico, em_serie)
+        for posicao in ((em_servico,) if em_servico is not None else ()) + em_serie:
+            self.dependentes.setdefault(posicao, []).append(ramo)
+
+    def ativo(self, ramo: Ramo, assinatura: np.ndarray) -> bool:
+        """Ramo em serviço e com todas as chaves em série fechadas."""
+        em_servico, em_serie = self._regras[ramo]
+        if em_servico is not None and not assinatura[em_servico]:
+            return False
+        return all(assinatura[p] for p in em_serie)
+
+    def afeta_fontes(self, posicoes: np.ndarray) -> bool:
+        return any(
+            ((posicoes >= ini) & (posicoes < fim)).any()
+            for ini, fim in self._faixas_fontes
+        )
+
+
+def _fontes_pandapower(net) -> Set[int]:
+    """Barras com rede externa ou gerador de referência em serviço."""
+    fontes = set(net.ext_grid.bus[net.ext_grid.in_service.astype(bool)])
+    if "slack" in net.gen:
+        slack = net.gen.in_service.astype(bool) & net.gen.slack.astype(bool)
+        fontes |= set(net.gen.bus[slack])
+    return {int(b) for b in fontes}
+
+
+def _zerar_resultados(net, tabela: str, indices=None) -> None:
+    """Zera res_<tabela> (todas as linhas ou só indices), alinhado aos elementos."""
+    res = "res_" + tabela
+    if tabela not in net or res not in net:
+        return
+    net[res] = net[res].reindex(net[tabela].index)
+    net[res].loc[net[res].index if indices is None else indices, :] = 0.0
+
+
+def executar_fluxo(
+    net, topologia: ProcessadorTopologia, runpp: Optional[Callable] = None
+):
+    """
+    Roda o fluxo apenas nas ilhas energizadas.
+
+    Barras mortas e ramos abertos ficam fora de serviço durante o cálculo
+    (só esses valores são guardados e restaurados em seguida), então o
+    pandapower não precisa refazer a checagem de conectividade. As barras
+    mortas recebem V = 0 e P = Q = 0 diretamente. Se não houver ilha
+    energizada, o fluxo não é executado e todos os resultados são zerados.
+    Retorna {barra: energizada} para os pontos DI_BARRA_ENERGIZADA.
+    """
+    topologia.sincronizar(net)
+    energizadas = topologia.estado_barras()
+    mortas = list(topologia.barras_mortas())
+
+    if len(mortas) == len(energizadas):
+        for tabela in TABELAS_RESULTADO:
+            _zerar_resultados(net, tabela)
+        return energizadas
+
+    if runpp is None:
+        import pandapower as pp
+
+        runpp = pp.runpp
+    abertos = topologia.ramos_abertos()
+    tabelas = {
+        "bus": mortas,
+        "line": abertos.get("linha", []),
+        "trafo": abertos.get("trafo", []),
+    }
+    em_servico = {}
+    for tabela, indices in tabelas.items():
+        if indices:
+            em_servico[tabela] = net[tabela].in_service.loc[indices].copy()
+            net[tabela].loc[indices, "in_service"] = False
+    try:
+        runpp(net, check_connectivity=False)
+    finally:
+        for tabela, valores in em_servico.items():
+            net[tabela].loc[valores.index, "in_service"] = valores
+
+    if mortas:
+        _zerar_resultados(net, "bus", mortas)
+    return energizadas
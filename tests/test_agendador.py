@@ -0,0 +1,137 @@
+import pytest
+from src.agendador import AgendadorCiclos
+
+
+class RelogioFalso:
+    """Relógio monotônico controlado manualmente (dormir avança o tempo)."""
+
+    def __init__(self):
+        self.agora = 100.0
+
+    def __call__(self):
+        return self.agora
+
+    def dormir(self, segundos):
+        self.agora += segundos
+
+
+def criar_agendador(relogio, **kwargs):
+    return AgendadorCiclos(relogio=relogio, dormir=relogio.dormir, **kwargs)
+
+
+def test_parametros_invalidos():
+    with pytest.raises(ValueError):
+        AgendadorCiclos(frequencia_hz=0)
+    with pytest.raises(ValueError):
+        AgendadorCiclos(politica="qualquer")
+
+
+def test_deadlines_sem_deriva():
+    relogio = RelogioFalso()
+    agendador = criar_agendador(relogio, frequencia_hz=10.0)
+
+    deadlines = []
+    for _ in range(5):
+        tick = agendador.esperar()
+        deadlines.append(tick.deadline)
+        relogio.agora += 0.03  # trabalho variável não acumula no período
+
+    assert deadlines == pytest.approx([100.0, 100.1, 100.2, 100.3, 100.4])
+    assert agendador.estatisticas.atrasos == 0
+
+
+def test_politica_pular():
+    relogio = RelogioFalso()
+    agendador = criar_agendador(relogio, frequencia_hz=10.0, politica="pular")
+
+    agendador.esperar()
+    relogio.agora += 0.35  # perde os deadlines de 100.1, 100.2 e 100.3
+    tick = agendador.esperar()
+
+    assert tick.deadline == pytest.approx(100.3)
+    assert tick.indice == 4
+    assert agendador.estatisticas.atrasos == 1
+    assert agendador.estatisticas.ciclos_pulados == 2
+    assert agendador.esperar().deadline == pytest.approx(100.4)
+
+
+def test_politica_recuperar():
+    relogio = RelogioFalso()
+    agendador = criar_agendador(relogio, frequencia_hz=10.0, politica="recuperar")
+
+    agendador.esperar()
+    relogio.agora += 0.35
+    deadlines = [agendador.esperar().deadline for _ in range(4)]
+
+    assert deadlines == pytest.approx([100.1, 100.2, 100.3, 100.4])
+    assert agendador.estatisticas.atrasos == 1  # um travamento, um atraso
+    assert agendador.estatisticas.ciclos_pulados == 0
+    assert relogio.agora == pytest.approx(100.4)
+
+
+def test_politica_degradar():
+    relogio = RelogioFalso()
+    agendador = criar_agendador(
+        relogio, frequencia_hz=10.0, politica="degradar", ciclos_para_acelerar=2
+    )
+
+    agendador.esperar()
+    relogio.agora += 0.15
+    agendador.esperar()
+    assert agendador.frequencia_hz == pytest.approx(5.0)
+
+    # só volta à taxa nominal após ciclos_para_acelerar ciclos rápidos seguidos
+    agendador.esperar()
+    assert agendador.frequencia_hz == pytest.approx(5.0)
+    agendador.esperar()
+    assert agendador.frequencia_hz == pytest.approx(10.0)
+
+
+def test_estatisticas_jitter():
+    relogio = RelogioFalso()
+    agendador = criar_agendador(relogio, frequencia_hz=10.0)
+
+    def trabalho(tick):
+        relogio.agora += 0.02
+
+    estatisticas = agendador.executar(trabalho, max_ciclos=3)
+
+    assert estatisticas.ciclos == 3
+    assert estatisticas.jitter_max_s == pytest.approx(0.0)
+    assert estatisticas.como_dict()["atrasos"] == 0
+
+
+def test_recuperar_limitado_apos_travamento():
+    relogio = RelogioFalso()
+    agendador = criar_agendador(
+        relogio, frequencia_hz=10.0, politica="recuperar", max_recuperacao=3
+    )
+
+    agendador.esperar()
+    relogio.agora += 100.0  # travamento longo
+    atrasos = []
+    while True:
+        tick = agendador.esperar()
+        if tick.atraso_s == 0.0:
+            break
+        atrasos.append(tick.atraso_s)
+
+    # no máximo o ciclo atual + 3 recuperados saem sem dormir
+    assert len(atrasos) <= 4
+    assert agendador.estatisticas.atrasos == 1
+    assert agendador.estatisticas.ciclos_pulados >= 990
+
+
+def test_degradar_com_histerese():
+    relogio = RelogioFalso()
+    agendador = criar_agendador(
+        relogio, frequencia_hz=10.0, politica="degradar", ciclos_para_acelerar=5
+    )
+
+    def trabalho(tick):
+        relogio.agora += 0.15  # sobrecarga constante a 10 Hz
+
+    estatisticas = agendador.executar(trabalho, max_ciclos=60)
+
+    # sem histerese o atraso se repetiria a cada dois ciclos (~30)
+    assert estatisticas.atrasos <= 60 // 6 + 1
@@ -0,0 +1,107 @@
+import multiprocessing
+import sys
+import threading
+
+import numpy as np
+
+from src.barramento import AnelComandos, BarramentoMedidas
+
+
+def _ler_em_outro_processo(nome, fila):
+    barramento = BarramentoMedidas.anexar(nome)
+    publicacao, valores = barramento.ler()
+    fila.put((publicacao, list(valores)))
+    barramento.fechar()
+
+
+def _enviar_em_outro_processo(nome, campainha):
+    anel = AnelComandos.anexar(nome, campainha=campainha)
+    anel.enviar(2, 1, t_escrita=10.0)
+    anel.enviar(1, 0, t_escrita=11.0)
+    anel.fechar()
+
+
+def test_publicar_e_ler_snapshot():
+    barramento = BarramentoMedidas.criar(4)
+    try:
+        barramento.publicar([1.0, 300.0, 50.0, 1.0])
+        barramento.publicar([0.98, 290.0, 48.0, 0.0])
+
+        destino = np.empty(4)
+        publicacao, valores = barramento.ler(destino)
+        assert publicacao == 2
+        assert valores is destino
+        assert list(valores) == [0.98, 290.0, 48.0, 0.0]
+    finally:
+        barramento.fechar()
+
+
+def test_publicacao_corresponde_aos_dados():
+    barramento = BarramentoMedidas.criar(64)
+    parar = threading.Event()
+
+    def escritor():
+        k = 0
+        while not parar.is_set():
+            k += 1
+            barramento.publicar(np.full(64, float(k)))
+
+    thread = threading.Thread(target=escritor)
+    intervalo = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)  # força intercalar leitor e escritor
+    thread.start()
+    try:
+        destino = np.empty(64)
+        for _ in range(20000):
+            publicacao, valores = barramento.ler(destino)
+            if publicacao:
+                assert valores[0] == valores[-1] == publicacao
+    finally:
+        parar.set()
+        thread.join()
+        sys.setswitchinterval(intervalo)
+        barramento.fechar()
+
+
+def test_leitura_entre_processos():
+    barramento = BarramentoMedidas.criar(3)
+    try:
+        barramento.publicar([1.0, 2.0, 3.0])
+        fila = multiprocessing.Queue()
+        processo = multiprocessing.Process(
+            target=_ler_em_outro_processo, args=(barramento.nome, fila)
+        )
+        processo.start()
+        assert fila.get(timeout=10) == (1, [1.0, 2.0, 3.0])
+        processo.join(10)
+    finally:
+        barramento.fechar()
+
+
+def test_anel_ordem_e_capacidade():
+    anel = AnelComandos.criar(capacidade=2)
+    try:
+        assert anel.enviar(1, 1, t_escrita=0.5)
+        assert anel.enviar(2, 0, t_escrita=0.6)
+        assert not anel.enviar(3, 1)
+        assert anel.retirar_todos() == [(1, 1, 0.5), (2, 0, 0.6)]
+        assert len(anel) == 0
+        assert anel.enviar(3, 1, t_escrita=0.7)
+        assert anel.retirar_todos() == [(3, 1, 0.7)]
+    finally:
+        anel.fechar()
+
+
+def test_anel_entre_processos():
+    campainha = multiprocessing.Event()
+    anel = AnelComandos.criar(capacidade=8, campainha=campainha)
+    try:
+        processo = multiprocessing.Process(
+            target=_enviar_em_outro_processo, args=(anel.nome, campainha)
+        )
+        processo.start()
+        assert campainha.wait(10)
+        processo.join(10)
+        assert anel.retirar_todos() == [(2, 1, 10.0), (1, 0, 11.0)]
+    finally:
+        anel.fechar()
@@ -0,0 +1,104 @@
+import threading
+import time
+
+import pytest
+from src.agendador import POLITICAS, AgendadorCiclos
+from src.comandos import Comando, FilaComandos, carregar_comandos, mapear_comandos
+
+
+def test_mapear_comandos_sequencial():
+    pontos = {
+        "Barra": {
+            "Comandos": [{"tag": "CO_CLOSE_BUS_TIE"}, {"tag": "CO_OPEN_BUS_TIE"}]
+        },
+        "Disjuntor": {
+            "Analogicos": [{"tag": "AI_Corrente_A"}],
+            "Comandos": [{"tag": "CMD_Abrir"}],
+        },
+    }
+    mapa = mapear_comandos(pontos, endereco_inicial=2)
+    assert mapa == {
+        2: ("Barra", "CO_CLOSE_BUS_TIE"),
+        3: ("Barra", "CO_OPEN_BUS_TIE"),
+        4: ("Disjuntor", "CMD_Abrir"),
+    }
+
+
+def test_fila_preserva_ordem():
+    fila = FilaComandos()
+    fila.enfileirar(Comando("Barra", "CO_CLOSE_BUS_TIE", 1))
+    fila.enfileirar(Comando("Barra", "CO_OPEN_BUS_TIE", 1))
+
+    assert fila.aguardar(0)
+    comandos = fila.retirar_todos()
+    assert [c.tag for c in comandos] == ["CO_CLOSE_BUS_TIE", "CO_OPEN_BUS_TIE"]
+    assert not fila.aguardar(0)
+
+
+def test_comando_acorda_espera():
+    fila = FilaComandos()
+
+    def escrever():
+        time.sleep(0.05)
+        fila.enfileirar(Comando("Disjuntor", "DJ1", 0, origem="modbus"))
+
+    threading.Thread(target=escrever).start()
+    inicio = time.perf_counter()
+    assert fila.aguardar(2.0)
+    assert time.perf_counter() - inicio < 1.0
+
+
+def test_latencia_registrada():
+    fila = FilaComandos()
+    cmd = Comando("Disjuntor", "DJ1", 1)
+    fila.enfileirar(cmd)
+    fila.retirar_todos()
+
+    latencia = fila.confirmar(cmd)
+    assert latencia >= 0
+    assert fila.latencia.amostras == 1
+    assert fila.latencia.latencia_max_s == latencia
+
+
+def test_carregar_comandos_independe_do_cwd(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    mapa = carregar_comandos(endereco_inicial=2)
+    assert mapa[2] == ("Barra", "CO_CLOSE_BUS_TIE")
+
+
+def laco_simulacao(agendador, fila, ciclos):
+    """Mesmo laço do simulador.py: comandos acordam o agendador antes do deadline."""
+    recebidos = []
+    agendador.iniciar()
+    while agendador.estatisticas.ciclos < ciclos:
+        tick = agendador.esperar(acordar=fila.evento)
+        if tick is None:
+            recebidos.extend(fila.retirar_todos())
+    return recebidos
+
+
+@pytest.mark.parametrize("politica", POLITICAS)
+def test_laco_ocioso_sem_atrasos(politica):
+    agendador = AgendadorCiclos(frequencia_hz=50.0, politica=politica)
+
+    laco_simulacao(agendador, FilaComandos(), ciclos=25)
+
+    assert agendador.estatisticas.atrasos == 0
+    assert agendador.frequencia_hz == pytest.approx(50.0)
+
+
+def test_comando_acorda_o_laco_sem_consumir_ciclo():
+    agendador = AgendadorCiclos(frequencia_hz=20.0, politica="degradar")
+    fila = FilaComandos()
+    timer = threading.Timer(
+        0.12, fila.enfileirar, args=(Comando("Disjuntor", "DJ1", 1),)
+    )
+    timer.start()
+
+    recebidos = laco_simulacao(agendador, fila, ciclos=8)
+    timer.join()
+
+    assert [c.tag for c in recebidos] == ["DJ1"]
+    assert agendador.estatisticas.atrasos == 0
+    assert agendador.estatisticas.ciclos_pulados == 0
+    assert agendador.frequencia_hz == pytest.approx(20.0)
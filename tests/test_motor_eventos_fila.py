@@ -0,0 +1,224 @@
+import time
+
+import numpy as np
+import pytest
+from src.classes import Barra, Equipamento, Linha
+from src.motor_eventos import Evento, MotorEventos
+from src.protecao import Disparo, MotorProtecao
+from src.topologia import ProcessadorTopologia
+
+
+@pytest.fixture(autouse=True)
+def pasta_logs(tmp_path, monkeypatch):
+    # o Logger grava em ./logs
+    monkeypatch.chdir(tmp_path)
+
+
+class ScadaFalso:
+    """Guarda as notificações recebidas com o instante de chegada."""
+
+    def __init__(self):
+        self.recebidos = []
+
+    def __call__(self, evento, payload):
+        self.recebidos.append((evento, payload, time.monotonic()))
+
+    def alarmes(self):
+        return [p["id"] for e, p, _ in self.recebidos if e == "alarme_manual"]
+
+
+class ProtecaoFalsa:
+    """Devolve disparos fixos relativos ao instante da falta."""
+
+    def __init__(self, religador_id):
+        self.religador_id = religador_id
+        self.chamadas = []
+        self.linhas = []
+
+    def definir_linha(self, linha_id, em_servico):
+        self.linhas.append((linha_id, em_servico))
+
+    def disparos_para_falha(self, barra_id, t0, tentativa=0):
+        self.chamadas.append((barra_id, t0))
+        params = {"barra_falta": barra_id, "tentativa": tentativa}
+        if tentativa >= 1:
+            params["bloqueio"] = True
+            return [Disparo(t0 + 0.05, "abertura_religador", self.religador_id, params)]
+        return [
+            Disparo(t0 + 0.05, "abertura_religador", self.religador_id, params),
+            Disparo(
+                t0 + 0.5,
+                "restauracao_religador",
+                self.religador_id,
+                dict(params, tentativa=1),
+            ),
+        ]
+
+
+def alarme(t, ident):
+    return Evento(t, "alarme_manual", alvo_id=0, parametros={"id": ident})
+
+
+def test_eventos_em_ordem_incluindo_agendados_antes():
+    scada = ScadaFalso()
+    motor = MotorEventos({}, scada_callback=scada)
+    motor.agendar(alarme(0.15, "pre"))
+
+    motor.run_scenario(
+        [alarme(0.3, "c"), alarme(0.1, "a"), alarme(0.2, "b")], realtime=False
+    )
+
+    assert scada.alarmes() == ["a", "pre", "b", "c"]
+
+
+def test_evento_agendado_durante_a_espera():
+    scada = ScadaFalso()
+    motor = MotorEventos({}, scada_callback=scada)
+
+    motor.start_in_thread([alarme(0.0, "a"), alarme(0.6, "c")], realtime=True)
+    time.sleep(0.1)
+    motor.agendar(alarme(0.2, "b"))
+    motor._thread.join(2.0)
+
+    assert scada.alarmes() == ["a", "b", "c"]
+    instantes = {p["id"]: t for e, p, t in scada.recebidos if e == "alarme_manual"}
+    # "b" sai no seu horário, sem esperar o evento "c"
+    assert instantes["b"] - instantes["a"] < 0.45
+    assert instantes["c"] - instantes["b"] > 0.2
+
+
+def test_disparos_da_protecao_viram_eventos():
+    scada = ScadaFalso()
+    protecao = ProtecaoFalsa(religador_id=7)
+    rede = {
+        "linhas": [Linha(1, 1, 2, 2.0)],
+        "equipamentos": [
+            Equipamento(7, "religador", barra=2, parametros={"estado": "fechado"})
+        ],
+    }
+    motor = MotorEventos(rede, scada_callback=scada, protecao=protecao)
+
+    motor.run_scenario(
+        [Evento(0.1, "falha_linha", alvo_id=1), alarme(0.3, "meio")], realtime=False
+    )
+
+    assert protecao.chamadas == [(2, pytest.approx(0.1))]
+    sequencia = [p.get("estado_atual", p.get("id", e)) for e, p, _ in scada.recebidos]
+    assert sequencia == ["falha_linha", "aberto", "meio", "fechado"]
+
+
+def rede_com_religador():
+    return {
+        "barras": [Barra(1, "Fonte", 13.8, tipo="slack"), Barra(2, "Carga", 13.8)],
+        "linhas": [Linha(1, 1, 2, 2.0)],
+        "equipamentos": [
+            Equipamento(
+                7, "religador", barra=2, parametros={"estado": "fechado", "linha_id": 1}
+            )
+        ],
+    }
+
+
+def energizacoes(scada):
+    return [
+        (p["barra_id"], p["valor"])
+        for e, p, _ in scada.recebidos
+        if e == "DI_BARRA_ENERGIZADA"
+    ]
+
+
+def test_religamento_sobre_falta_permanente_bloqueia():
+    scada = ScadaFalso()
+    rede = rede_com_religador()
+    topologia = ProcessadorTopologia.de_objetos(rede)
+    protecao = ProtecaoFalsa(religador_id=7)
+    motor = MotorEventos(
+        rede, scada_callback=scada, protecao=protecao, topologia=topologia
+    )
+
+    motor.run_scenario([Evento(0.1, "falha_linha", alvo_id=1)], realtime=False)
+
+    estados = [
+        p["estado_atual"] for e, p, _ in scada.recebidos if e == "estado_equipamento"
+    ]
+    assert estados == ["aberto", "fechado", "bloqueado"]
+    assert protecao.chamadas == [(2, pytest.approx(0.1)), (2, pytest.approx(0.6))]
+    assert protecao.linhas == [(1, False), (1, True), (1, False)]
+    assert not topologia.energizada(2)
+    assert energizacoes(scada) == [(2, False)]
+
+
+def test_religamento_sem_falha_reenergiza():
+    scada = ScadaFalso()
+    rede = rede_com_religador()
+    topologia = ProcessadorTopologia.de_objetos(rede)
+    motor = MotorEventos(rede, scada_callback=scada, topologia=topologia)
+
+    motor.run_scenario(
+        [
+            Evento(0.1, "abertura_religador", alvo_id=7),
+            Evento(0.2, "restauracao_religador", alvo_id=7),
+        ],
+        realtime=False,
+    )
+
+    assert topologia.energizada(2)
+    assert energizacoes(scada) == [(2, False), (2, True)]
+
+
+def test_protecao_avalia_a_topologia_apos_a_atuacao():
+    pp = pytest.importorskip("pandapower")
+
+    net = pp.create_empty_network()
+    for _ in range(3):
+        pp.create_bus(net, vn_kv=13.8)
+    pp.create_ext_grid(net, 0)
+    pp.create_line_from_parameters(net, 0, 1, 1.0, 0.1, 0.1, 0.0, 1.0)
+    pp.create_line_from_parameters(net, 1, 2, 1.0, 0.1, 0.1, 0.0, 1.0)
+    estados = []
+
+    def curto_falso(rede):
+        estados.append(tuple(rede.line.in_service))
+        return np.full(len(rede.bus), 5.0)
+
+    religador = Equipamento(
+        7,
+        "religador",
+        barra=1,
+        parametros={"pickup_a": 200.0, "barras": [2], "linha_id": 1},
+    )
+    rele = Equipamento(
+        8,
+        "rele_protecao",
+        barra=0,
+        parametros={"pickup_a": 200.0, "barras": [1, 2], "tms": 1.0},
+    )
+    rede = {
+        "linhas": [Linha(0, 0, 1, 1.0), Linha(1, 1, 2, 1.0)],
+        "equipamentos": [religador, rele],
+    }
+    protecao = MotorProtecao(net, [religador, rele], calcular_curto=curto_falso)
+    motor = MotorEventos(rede, protecao=protecao)
+
+    motor.run_scenario(
+        [Evento(0.1, "falha_linha", alvo_id=1), Evento(5.0, "falha_linha", alvo_id=0)],
+        realtime=False,
+    )
+
+    # a segunda falta vê a linha 1 aberta pelo religador, não as correntes anteriores
+    assert estados == [(True, True), (True, False)]
+    assert not net.line.in_service.at[1]
+    assert religador.parametros["estado"] == "aberto"
+
+
+def test_stop_descarta_eventos_pendentes():
+    scada = ScadaFalso()
+    motor = MotorEventos({}, scada_callback=scada)
+
+    motor.start_in_thread([alarme(0.0, "a"), alarme(5.0, "b")], realtime=True)
+    time.sleep(0.1)
+    motor.stop(timeout=2.0)
+
+    assert not motor._thread.is_alive()
+    assert motor._proximo_evento() is None
+    assert scada.alarmes() == ["a"]
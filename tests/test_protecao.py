@@ -0,0 +1,126 @@
+import numpy as np
+import pytest
+from src.classes import Equipamento
+from src.protecao import MotorProtecao, chave_topologia
+
+pp = pytest.importorskip("pandapower")
+
+
+def criar_rede():
+    net = pp.create_empty_network()
+    b0 = pp.create_bus(net, vn_kv=13.8)
+    b1 = pp.create_bus(net, vn_kv=13.8)
+    b2 = pp.create_bus(net, vn_kv=13.8)
+    pp.create_ext_grid(net, bus=b0, s_sc_max_mva=100.0, rx_max=0.1)
+    pp.create_line_from_parameters(net, b0, b1, 2.0, 0.3, 0.4, 0.0, 0.4)
+    pp.create_line_from_parameters(net, b1, b2, 2.0, 0.3, 0.4, 0.0, 0.4)
+    pp.create_switch(net, bus=b1, element=1, et="l", closed=True)
+    return net
+
+
+def rele(id, barras, pickup_a, tms=0.1, **extra):
+    parametros = {"pickup_a": pickup_a, "tms": tms, "barras": barras, **extra}
+    return Equipamento(id, "religador", barra=barras[0], parametros=parametros)
+
+
+def test_curva_iec_normalmente_inversa():
+    net = criar_rede()
+    motor = MotorProtecao(net, [rele(1, [1], pickup_a=100.0, tms=1.0)])
+
+    tempos = motor.tempos_atuacao(np.array([1000.0]))
+    assert tempos[0] == pytest.approx(0.14 / (10.0**0.02 - 1.0))
+    assert np.isinf(motor.tempos_atuacao(np.array([50.0]))[0])
+
+
+def test_disparo_do_rele_mais_rapido_com_religamento():
+    net = criar_rede()
+    reles = [
+        rele(1, [1, 2], pickup_a=200.0, tms=0.3),
+        rele(2, [2], pickup_a=200.0, tms=0.05, religamento_s=1.0),
+        Equipamento(3, "transformador", barra=0),
+    ]
+    motor = MotorProtecao(net, reles)
+
+    disparos = motor.disparos_para_falha(2, t0=5.0)
+    assert [(d.tipo, d.alvo_id) for d in disparos] == [
+        ("abertura_religador", 2),
+        ("restauracao_religador", 2),
+    ]
+    assert disparos[0].tempo_offset_s > 5.0
+    assert disparos[1].tempo_offset_s == pytest.approx(disparos[0].tempo_offset_s + 1.0)
+
+
+def test_curto_calculado_uma_vez_por_topologia():
+    net = criar_rede()
+    chamadas = []
+
+    def curto_falso(rede):
+        chamadas.append(chave_topologia(rede))
+        return np.full(len(rede.bus), 5.0)
+
+    motor = MotorProtecao(
+        net, [rele(1, [2], pickup_a=100.0)], calcular_curto=curto_falso
+    )
+    motor.disparos_para_falha(2)
+    motor.disparos_para_falha(2)
+    assert len(chamadas) == 1
+
+    net.switch.at[0, "closed"] = False
+    motor.disparos_para_falha(2)
+    assert len(chamadas) == 2
+
+
+def test_chave_topologia_inclui_fontes_e_ramos():
+    net = criar_rede()
+    pp.create_sgen(net, 2, p_mw=1.0)
+    chave = chave_topologia(net)
+
+    for tabela in ("ext_grid", "sgen", "line"):
+        net[tabela].at[0, "in_service"] = False
+        assert chave_topologia(net) != chave
+        net[tabela].at[0, "in_service"] = True
+    assert chave_topologia(net) == chave
+
+
+def test_definir_linha_muda_o_curto_usado():
+    net = criar_rede()
+    chamadas = []
+
+    def curto_falso(rede):
+        chamadas.append(bool(rede.line.in_service.at[1]))
+        return np.full(len(rede.bus), 5.0)
+
+    motor = MotorProtecao(
+        net,
+        [rele(1, [2], pickup_a=100.0)],
+        calcular_curto=curto_falso,
+        mapa_linhas={10: 1},
+    )
+    motor.disparos_para_falha(2)
+    motor.definir_linha(10, False)
+    motor.disparos_para_falha(2)
+
+    assert chamadas == [True, False]
+    with pytest.raises(KeyError):
+        motor.definir_linha(99, False)
+
+
+def test_bloqueio_apos_esgotar_religamentos():
+    net = criar_rede()
+    motor = MotorProtecao(
+        net, [rele(1, [2], pickup_a=200.0, religamento_s=1.0, max_religamentos=2)]
+    )
+
+    tentativas = []
+    t, tentativa = 0.0, 0
+    while True:
+        disparos = motor.disparos_para_falha(2, t0=t, tentativa=tentativa)
+        tentativas.append([d.tipo for d in disparos])
+        if len(disparos) == 1:
+            break
+        t, tentativa = disparos[1].tempo_offset_s, disparos[1].parametros["tentativa"]
+
+    assert tentativas == [["abertura_religador", "restauracao_religador"]] * 2 + [
+        ["abertura_religador"]
+    ]
+    assert disparos[0].parametros["bloqueio"]
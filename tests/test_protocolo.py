@@ -0,0 +1,99 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("pymodbus")
+
+from protocols.modbus_simulator import BlocoComandos, BlocoMedidas  # noqa: E402
+from src.barramento import BarramentoMedidas  # noqa: E402
+
+
+class BarramentoFalso:
+    """Conta os snapshots e guarda os vetores de destino recebidos."""
+
+    def __init__(self, valores):
+        self.valores = np.array(valores, dtype=float)
+        self.n_medidas = len(self.valores)
+        self.destinos = []
+
+    def ler(self, destino=None):
+        self.destinos.append(destino)
+        np.copyto(destino, self.valores)
+        return 1, destino
+
+
+def criar_bloco(**kwargs):
+    escritas = []
+    bloco = BlocoComandos(
+        1, [0] * 10, ao_escrever=lambda a, v: escritas.append((a, v)), **kwargs
+    )
+    return bloco, escritas
+
+
+def test_escrita_de_cliente_dispara_callback():
+    bloco, escritas = criar_bloco()
+    bloco.setValues(2, [1, 0, True])
+
+    assert escritas == [(2, 1), (3, 0), (4, 1)]
+    assert bloco.getValues(2, 3) == [1, 0, True]
+
+
+def test_escrita_escalar():
+    bloco, escritas = criar_bloco()
+    bloco.setValues(1, True)
+
+    assert escritas == [(1, 1)]
+    assert bloco.getValues(1, 1) == [True]
+
+
+def test_atualizar_status_nao_dispara_callback():
+    bloco, escritas = criar_bloco()
+    bloco.atualizar_status(1, [1])
+
+    assert escritas == []
+    assert bloco.getValues(1, 1) == [1]
+
+
+def test_bloco_medidas_um_snapshot_preallocado_por_leitura():
+    barramento = BarramentoFalso([1.02, 150.0, np.nan])
+    bloco = BlocoMedidas(1, 10, barramento, {1: (0, 1000.0), 2: (1, 1.0), 3: (2, 1.0)})
+
+    assert bloco.getValues(1, 10)[:4] == [1020, 150, 0, 0]  # NaN mantém o armazenado
+    bloco.getValues(1, 10)
+
+    assert len(barramento.destinos) == 2
+    assert barramento.destinos[0] is barramento.destinos[1]
+
+
+def test_bloco_medidas_com_barramento_real():
+    barramento = BarramentoMedidas.criar(3)
+    try:
+        bloco = BlocoMedidas(1, 10, barramento, {1: (0, 1000.0), 3: (2, 1.0)})
+        assert bloco.getValues(1, 3) == [0, 0, 0]
+        barramento.publicar([0.98, 5.0, 1.0])
+        assert bloco.getValues(1, 3) == [980, 0, 1]
+    finally:
+        barramento.fechar()
+
+
+def test_ler_status_recebe_um_snapshot_por_leitura():
+    barramento = BarramentoFalso([1.0])
+    chamadas = []
+
+    def ler_status(endereco, medidas):
+        chamadas.append((endereco, medidas))
+        return int(medidas[0]) if endereco == 1 else None
+
+    bloco, _ = criar_bloco(ler_status=ler_status, barramento=barramento)
+
+    assert bloco.getValues(1, 5) == [1, 0, 0, 0, 0]
+    assert len(barramento.destinos) == 1
+    assert [e for e, _ in chamadas] == [1, 2, 3, 4, 5]
+    assert all(m is barramento.destinos[0] for _, m in chamadas)
+
+
+def test_ler_status_sem_barramento():
+    bloco, _ = criar_bloco(
+        ler_status=lambda endereco, medidas: 1 if medidas is None else 0
+    )
+
+    assert bloco.getValues(1, 2) == [1, 1]
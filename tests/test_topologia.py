@@ -0,0 +1,242 @@
+import random
+
+import pytest
+
+from src.classes import Barra, Linha
+from src.topologia import ProcessadorTopologia
+
+
+def radial(n=5):
+    """Alimentador 0-1-2-...-(n-1) com fonte na barra 0."""
+    topologia = ProcessadorTopologia(range(n), fontes=[0])
+    for i in range(n - 1):
+        topologia.adicionar_ramo(("linha", i), i, i + 1)
+    return topologia
+
+
+def test_abrir_linha_desenergiza_jusante():
+    topologia = radial()
+    assert topologia.barras_mortas() == set()
+
+    assert topologia.definir_ramo(("linha", 2), False) == {3, 4}
+    assert not topologia.energizada(4)
+    assert topologia.energizada(2)
+
+    assert topologia.definir_ramo(("linha", 2), True) == {3, 4}
+    assert topologia.barras_mortas() == set()
+
+
+def test_malha_nao_separa():
+    topologia = radial(4)
+    topologia.adicionar_ramo(("chave", 0), 0, 3)
+
+    assert topologia.definir_ramo(("linha", 1), False) == set()
+    assert len(topologia.ilhas()) == 1
+
+
+def test_manobra_em_ilha_morta_nao_muda_energizacao():
+    topologia = radial()
+    topologia.definir_ramo(("linha", 1), False)
+
+    assert topologia.definir_ramo(("linha", 3), False) == set()
+    assert topologia.barras_mortas() == {2, 3, 4}
+    assert sorted(len(m) for m, _ in topologia.ilhas()) == [1, 2, 2]
+
+
+def test_de_objetos_respeita_linha_fora():
+    barras = [
+        Barra(1, "A", 13.8, tipo="slack"),
+        Barra(2, "B", 13.8),
+        Barra(3, "C", 13.8),
+    ]
+    linha = Linha(2, 2, 3, 1.0)
+    linha.estado = "fora"
+    rede = {"barras": barras, "linhas": [Linha(1, 1, 2, 1.0), linha]}
+
+    topologia = ProcessadorTopologia.de_objetos(rede)
+    assert topologia.barras_energizadas() == {1, 2}
+    assert topologia.barras_mortas() == {3}
+
+
+def test_equivale_a_busca_completa():
+    rng = random.Random(7)
+    n = 30
+    ramos = [(rng.randrange(n), rng.randrange(n)) for _ in range(45)]
+    topologia = ProcessadorTopologia(range(n), fontes=[0, 1])
+    estado = {}
+    for i, (a, b) in enumerate(ramos):
+        topologia.adicionar_ramo(i, a, b)
+        estado[i] = True
+
+    def energizadas_por_busca():
+        vistos, pilha = {0, 1}, [0, 1]
+        while pilha:
+            x = pilha.pop()
+            for i, (a, b) in enumerate(ramos):
+                if estado[i] and x in (a, b):
+                    y = b if x == a else a
+                    if y not in vistos:
+                        vistos.add(y)
+                        pilha.append(y)
+        return vistos
+
+    for _ in range(200):
+        i = rng.randrange(len(ramos))
+        estado[i] = not estado[i]
+        antes = topologia.barras_energizadas()
+        mudaram = topologia.definir_ramo(i, estado[i])
+        assert topologia.barras_energizadas() == energizadas_por_busca()
+        assert mudaram == antes ^ topologia.barras_energizadas()
+
+
+def test_executar_fluxo_so_nas_ilhas_energizadas():
+    pp = pytest.importorskip("pandapower")
+    from src.topologia import executar_fluxo
+
+    net = pp.create_empty_network()
+    barras = [pp.create_bus(net, vn_kv=13.8) for _ in range(3)]
+    pp.create_ext_grid(net, barras[0])
+    pp.create_line_from_parameters(net, barras[0], barras[1], 1.0, 0.1, 0.1, 0.0, 1.0)
+    pp.create_line_from_parameters(net, barras[1], barras[2], 1.0, 0.1, 0.1, 0.0, 1.0)
+    pp.create_load(net, barras[2], p_mw=0.5)
+    pp.create_switch(net, barras[1], 1, et="l", closed=False)
+
+    topologia = ProcessadorTopologia.de_pandapower(net)
+    energizadas = executar_fluxo(net, topologia)
+
+    assert energizadas == {0: True, 1: True, 2: False}
+    assert net.res_bus.vm_pu.at[2] == 0.0
+    assert net.res_bus.vm_pu.at[1] == pytest.approx(1.0, abs=1e-3)
+    assert net.bus.in_service.all()
+
+    net.switch.at[0, "closed"] = True
+    assert executar_fluxo(net, topologia)[2]
+    assert net.res_bus.vm_pu.at[2] > 0.9
+
+
+def rede_radial_pp(pp):
+    net = pp.create_empty_network()
+    barras = [pp.create_bus(net, vn_kv=13.8) for _ in range(3)]
+    pp.create_ext_grid(net, barras[0])
+    pp.create_line_from_parameters(net, barras[0], barras[1], 1.0, 0.1, 0.1, 0.0, 1.0)
+    pp.create_line_from_parameters(net, barras[1], barras[2], 1.0, 0.1, 0.1, 0.0, 1.0)
+    pp.create_load(net, barras[2], p_mw=0.5)
+    return net
+
+
+def test_sincronizar_so_reavalia_ramos_que_mudaram(monkeypatch):
+    pp = pytest.importorskip("pandapower")
+
+    net = rede_radial_pp(pp)
+    chave = pp.create_switch(net, 1, 1, et="l")
+    topologia = ProcessadorTopologia.de_pandapower(net)
+    reavaliados = []
+    original = topologia.definir_ramo
+
+    def definir_ramo(ramo, ativo):
+        reavaliados.append(ramo)
+        return original(ramo, ativo)
+
+    monkeypatch.setattr(topologia, "definir_ramo", definir_ramo)
+
+    assert topologia.sincronizar(net) == set()
+    assert reavaliados == []
+
+    net.switch.at[chave, "closed"] = False
+    assert topologia.sincronizar(net) == {2}
+    assert reavaliados == [("linha", 1)]
+
+    net.line.at[0, "in_service"] = False
+    assert topologia.sincronizar(net) == {1}
+    assert reavaliados == [("linha", 1), ("linha", 0)]
+    assert topologia.sincronizar(net) == set()
+
+    pp.create_line_from_parameters(net, 0, 2, 1.0, 0.1, 0.1, 0.0, 1.0)
+    with pytest.raises(ValueError):
+        topologia.sincronizar(net)
+
+
+def test_sincronizar_equivale_a_reconstruir():
+    pp = pytest.importorskip("pandapower")
+
+    rng = random.Random(7)
+    net = pp.create_empty_network()
+    barras = [pp.create_bus(net, vn_kv=13.8) for _ in range(30)]
+    pp.create_ext_grid(net, barras[0])
+    pp.create_ext_grid(net, barras[15])
+    for _ in range(45):
+        a, b = rng.sample(barras, 2)
+        linha = pp.create_line_from_parameters(net, a, b, 1.0, 0.1, 0.1, 0.0, 1.0)
+        pp.create_switch(net, a, linha, et="l")
+    for _ in range(5):
+        pp.create_switch(net, *rng.sample(barras, 2), et="b")
+    topologia = ProcessadorTopologia.de_pandapower(net)
+
+    for _ in range(200):
+        tabela, coluna = rng.choice(
+            [("switch", "closed"), ("line", "in_service"), ("ext_grid", "in_service")]
+        )
+        idx = rng.choice(list(net[tabela].index))
+        net[tabela].at[idx, coluna] = not net[tabela].at[idx, coluna]
+        topologia.sincronizar(net)
+        assert (
+            topologia.barras_mortas()
+            == ProcessadorTopologia.de_pandapower(net).barras_mortas()
+        )
+
+
+def test_fonte_fora_de_servico_zera_resultados():
+    pp = pytest.importorskip("pandapower")
+    from src.topologia import executar_fluxo
+
+    net = rede_radial_pp(pp)
+    gerador = pp.create_gen(net, 1, p_mw=0.0, slack=True, in_service=False)
+    topologia = ProcessadorTopologia.de_pandapower(net)
+    executar_fluxo(net, topologia)
+    assert net.res_load.p_mw.at[0] == pytest.approx(0.5)
+
+    def runpp_proibido(net, **kwargs):
+        raise AssertionError("fluxo sem ilha energizada")
+
+    net.ext_grid.at[0, "in_service"] = False
+    assert executar_fluxo(net, topologia, runpp=runpp_proibido) == {
+        0: False,
+        1: False,
+        2: False,
+    }
+    assert (net.res_load.p_mw == 0.0).all()
+    assert (net.res_line.p_from_mw == 0.0).all()
+    assert (net.res_bus.vm_pu == 0.0).all()
+
+    # gerador de referência entra em serviço e assume como fonte
+    net.gen.at[gerador, "in_service"] = True
+    assert topologia.sincronizar(net) == {0, 1, 2}
+    assert executar_fluxo(net, topologia)[2]
+    assert net.res_load.p_mw.at[0] == pytest.approx(0.5)
+
+
+def test_trafo3w_impedancia_e_chave_t3():
+    pp = pytest.importorskip("pandapower")
+    from src.topologia import executar_fluxo
+
+    net = pp.create_empty_network()
+    at, mt, bt = (pp.create_bus(net, vn_kv=v) for v in (110.0, 20.0, 10.0))
+    extra = pp.create_bus(net, vn_kv=20.0)
+    pp.create_ext_grid(net, at)
+    pp.create_transformer3w(net, at, mt, bt, "63/25/38 MVA 110/20/10 kV")
+    pp.create_impedance(net, mt, extra, rft_pu=0.01, xft_pu=0.01, sn_mva=10.0)
+    pp.create_load(net, bt, p_mw=1.0)
+    pp.create_load(net, extra, p_mw=1.0)
+    chave_bt = pp.create_switch(net, bt, 0, et="t3")
+
+    topologia = ProcessadorTopologia.de_pandapower(net)
+    assert topologia.barras_mortas() == set()
+
+    net.switch.at[chave_bt, "closed"] = False
+    energizadas = executar_fluxo(net, topologia)
+    assert energizadas == {at: True, mt: True, bt: False, extra: True}
+    assert net.res_bus.vm_pu.at[bt] == 0.0
+    assert net.res_bus.vm_pu.at[extra] > 0.9
+
+    net.impedance.at[0, "in_service"] = False
+    assert topologia.sincronizar(net) == {extra}